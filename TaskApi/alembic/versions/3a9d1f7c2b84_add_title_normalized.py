@@ -0,0 +1,26 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = '3a9d1f7c2b84'
+down_revision: Union[str, Sequence[str], None] = '75e72c6549f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # columna con el título normalizado (sin espacios y en minúsculas) para buscar por título exacto
+    op.add_column('tasks', sa.Column('title_normalized', sa.String(length=100), nullable=True))
+    # llenar la columna con las tareas existentes
+    op.execute("UPDATE tasks SET title_normalized = LOWER(TRIM(title))")
+    op.alter_column('tasks', 'title_normalized', existing_type=sa.String(length=100), nullable=False)
+    # índice no único, la base puede tener títulos repetidos de antes
+    op.create_index(op.f('ix_tasks_title_normalized'), 'tasks', ['title_normalized'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_title_normalized'), table_name='tasks')
+    op.drop_column('tasks', 'title_normalized')
@@ -0,0 +1,32 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = '8c4e2a6b1d95'
+down_revision: Union[str, Sequence[str], None] = '3a9d1f7c2b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # los índices FULLTEXT con parser ngram solo existen en MySQL
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    # sin stopwords al crear el índice, con ngram quitarían pedazos de palabras ("a", "is", ...)
+    op.execute("SET SESSION innodb_ft_enable_stopword = 0")
+    # índice para el filtro de getAllTasks (título o descripción)
+    op.create_index('ix_tasks_title_description_ft', 'tasks', ['title', 'description'],
+                    unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+    # índice para getTaskByTitle (solo título)
+    op.create_index('ix_tasks_title_ft', 'tasks', ['title'],
+                    unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_tasks_title_ft', table_name='tasks')
+    op.drop_index('ix_tasks_title_description_ft', table_name='tasks')
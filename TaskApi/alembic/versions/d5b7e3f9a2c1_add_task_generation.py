@@ -0,0 +1,27 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = 'd5b7e3f9a2c1'
+down_revision: Union[str, Sequence[str], None] = '8c4e2a6b1d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # generación de escrituras compartida por todos los workers para el caché de totales
+    op.create_table('task_generation',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('row_generation', sa.BigInteger(), nullable=False),
+    sa.Column('content_generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # la única fila que se incrementa
+    op.execute("INSERT INTO task_generation (id, row_generation, content_generation) VALUES (1, 0, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('task_generation')
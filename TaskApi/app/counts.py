@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text
+from . import models
+
+# Caché en memoria de los totales de getAllTasks por filtro, para no repetir el COUNT en cada página.
+# Cada worker de gunicorn tiene su propio caché, pero cada total se guarda con la generación de
+# escrituras de la tabla task_generation: cualquier worker que cree, edite o elimine una tarea la
+# incrementa justo después de su commit, así los demás workers dejan de usar los totales viejos.
+TASK_COUNT_CACHE_TTL = int(os.getenv("TASK_COUNT_CACHE_TTL", 30))
+TASK_COUNT_CACHE_SIZE = int(os.getenv("TASK_COUNT_CACHE_SIZE", 1000))
+# "exact" usa COUNT(*); "estimated" usa las estadísticas de la tabla para las consultas sin filtro
+TASK_COUNT_MODE = os.getenv("TASK_COUNT_MODE", "exact").lower()
+
+_GENERATION_ID = 1
+
+_lock = threading.Lock()
+# para avisar solo una vez por proceso que falta la fila de generación
+_missing_warned = False
+# filtro normalizado -> (generación, expira, total)
+_counts: "OrderedDict[str, tuple]" = OrderedDict()
+
+# La búsqueda no distingue mayúsculas, así que el filtro se guarda en minúsculas
+def _normalize(filter) -> str:
+    return (filter or "").lower()
+
+# Generación actual (rows, content) o None si la tabla no tiene la fila
+def _generation(db):
+    row = db.query(models.TaskGeneration.row_generation, models.TaskGeneration.content_generation).filter(
+        models.TaskGeneration.id == _GENERATION_ID
+    ).first()
+    return tuple(row) if row else None
+
+# Avisa (una vez por proceso) que la tabla task_generation no tiene la fila
+def _warn_missing():
+    global _missing_warned
+    if not _missing_warned:
+        _missing_warned = True
+        print(f"task_generation has no row id={_GENERATION_ID}, task totals are not cached")
+
+# Revisa al arrancar que exista la fila que siembra la migración y la crea si falta
+def check_generation_row(session_factory):
+    db = session_factory()
+    try:
+        if _generation(db) is None:
+            _warn_missing()
+            db.add(models.TaskGeneration(id=_GENERATION_ID, row_generation=0, content_generation=0))
+            db.commit()
+    except Exception as e:
+        # otro worker pudo crearla al mismo tiempo
+        db.rollback()
+        print(f"Error checking task_generation: {e}")
+    finally:
+        db.close()
+
+# Incrementa la generación en su propia transacción corta, después del commit de la escritura,
+# para no tener bloqueada la fila compartida mientras dura la escritura
+def bump(db, rows: bool = True, content: bool = False):
+    values = {}
+    if rows:
+        values[models.TaskGeneration.row_generation] = models.TaskGeneration.row_generation + 1
+    if content:
+        values[models.TaskGeneration.content_generation] = models.TaskGeneration.content_generation + 1
+    if not values:
+        return
+    try:
+        updated = db.query(models.TaskGeneration).filter(models.TaskGeneration.id == _GENERATION_ID).update(
+            values, synchronize_session=False
+        )
+        db.commit()
+        if not updated:
+            _warn_missing()
+    except Exception as e:
+        # la escritura ya se guardó, los totales viejos duran como mucho TASK_COUNT_CACHE_TTL
+        db.rollback()
+        print(f"Error updating task_generation: {e}")
+
+# Total aproximado de filas según information_schema (None si no se puede)
+def _estimated_total(db):
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    try:
+        return db.execute(text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'tasks'"
+        )).scalar()
+    except Exception as e:
+        print(f"Error reading table statistics: {e}")
+        return None
+
+# Devuelve el total de la consulta ya filtrada, del caché o calculándolo
+def count_tasks(db, query, filter=None) -> int:
+    key = _normalize(filter)
+    # se lee primero para que el COUNT use la misma foto de la base que la generación
+    generation = _generation(db)
+    if generation is None:
+        # sin la fila de generación no se puede saber si el total cambió
+        _warn_missing()
+        return query.count()
+    # el total sin filtro solo cambia al crear o eliminar
+    generation = generation[:1] if not key else generation
+    now = time.monotonic()
+    with _lock:
+        cached = _counts.get(key)
+        if cached and cached[0] == generation and cached[1] > now:
+            _counts.move_to_end(key)
+            return cached[2]
+
+    total = None
+    # las estadísticas solo sirven para la tabla completa
+    if TASK_COUNT_MODE == "estimated" and not key:
+        total = _estimated_total(db)
+    if total is None:
+        total = query.count()
+
+    with _lock:
+        _counts[key] = (generation, now + TASK_COUNT_CACHE_TTL, total)
+        _counts.move_to_end(key)
+        # quitar los filtros menos usados
+        while len(_counts) > TASK_COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return total
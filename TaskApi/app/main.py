@@ -1,3 +1,8 @@
 from .service import wsgi_application
+from .database import SessionLocal
+from . import counts
+
+# la caché de totales necesita la fila de task_generation que crea la migración
+counts.check_generation_row(SessionLocal)
 
 app = wsgi_application
\ No newline at end of file
@@ -1,12 +1,45 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Date, Index
+from sqlalchemy.orm import validates
 from .database import Base
 
 # Modelo de la tabla 'tasks' para la base de datos
 class Task(Base):
     __tablename__ = "tasks"
+    # índices FULLTEXT (ngram) para la búsqueda por texto, ver app/search.py
+    __table_args__ = (
+        Index("ix_tasks_title_description_ft", "title", "description",
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        Index("ix_tasks_title_ft", "title",
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String(100), nullable=False, index=True)
     description = Column(String(255), nullable=True)
     isCompleted = Column(Boolean, default=False, nullable=False)
-    endDate = Column(Date, nullable=False)
\ No newline at end of file
+    endDate = Column(Date, nullable=False)
+    # título sin espacios y en minúsculas para buscar por título exacto con índice
+    title_normalized = Column(String(100), nullable=False, index=True)
+
+    # cada vez que cambia el título se actualiza el normalizado
+    @validates("title")
+    def _set_title_normalized(self, key, value):
+        self.title_normalized = normalize_title(value)
+        return value
+
+
+# Normaliza el título igual que la validación de conflictos del gateway
+def normalize_title(title):
+    return (title or "").strip().lower()
+
+# Generación de escrituras de la tabla 'tasks' (una sola fila, id = 1).
+# Se incrementa justo después del commit de cada escritura para que todos los workers
+# sepan si los totales que guardaron en memoria siguen siendo válidos (ver app/counts.py)
+class TaskGeneration(Base):
+    __tablename__ = "task_generation"
+
+    id = Column(Integer, primary_key=True)
+    # cambia al crear o eliminar tareas (total sin filtro)
+    row_generation = Column(BigInteger, nullable=False, default=0)
+    # cambia al editar título o descripción (totales con filtro)
+    content_generation = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,69 @@
+import base64
+import datetime
+import json
+from spyne import Fault
+from sqlalchemy import and_, literal, or_
+from . import models
+
+# Paginación por cursor (keyset): en lugar de OFFSET se busca a partir del último
+# par (columna de orden, id) de la página anterior, así las páginas profundas cuestan lo mismo.
+
+# Columna de orden, si no es una columna de la tabla se ordena por id
+def sort_column(sortBy):
+    if sortBy and sortBy in models.Task.__table__.columns:
+        return getattr(models.Task, sortBy)
+    return models.Task.id
+
+# Orden de la consulta, siempre con id para desempatar
+def order_by(column, desc: bool):
+    if column is models.Task.id:
+        return [column.desc() if desc else column.asc()]
+    if desc:
+        return [column.desc(), models.Task.id.desc()]
+    return [column.asc(), models.Task.id.asc()]
+
+def _invalid_cursor():
+    return Fault(faultcode='Client.InvalidCursor', faultstring='Cursor inválido.')
+
+# Cursor opaco: base64 de {"s": sortBy, "o": orden, "v": valor, "id": id}
+def encode_cursor(task, column, desc: bool) -> str:
+    value = getattr(task, column.key)
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    data = {"s": column.key, "o": "desc" if desc else "asc", "v": value, "id": task.id}
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+# Devuelve (valor, id) del cursor; debe ser del mismo orden que la consulta
+def decode_cursor(cursor: str, column, desc: bool):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value, last_id = data["v"], int(data["id"])
+        if data["s"] != column.key or data["o"] != ("desc" if desc else "asc"):
+            raise ValueError("cursor de otro orden")
+        if value is not None and column.type.python_type is datetime.date:
+            value = datetime.date.fromisoformat(value)
+    except Fault:
+        raise
+    except Exception:
+        raise _invalid_cursor()
+    return value, last_id
+
+# Filtro para las filas después del cursor (MySQL pone los NULL primero en asc y al final en desc)
+def keyset_filter(column, value, last_id: int, desc: bool):
+    task_id = models.Task.id
+    if column is task_id:
+        return task_id < last_id if desc else task_id > last_id
+    if desc:
+        if value is None:
+            return and_(column.is_(None), task_id < last_id)
+        # como parámetro con el tipo de la columna (las comparaciones con True/False no se permiten directo)
+        value = literal(value, column.type)
+        condition = or_(column < value, and_(column == value, task_id < last_id))
+        # los NULL van después de todos los valores
+        return or_(condition, column.is_(None)) if column.nullable else condition
+    if value is None:
+        return or_(and_(column.is_(None), task_id > last_id), column.isnot(None))
+    value = literal(value, column.type)
+    return or_(column > value, and_(column == value, task_id > last_id))
@@ -0,0 +1,41 @@
+import os
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import match
+from .database import engine
+from . import models
+
+# Modo de búsqueda por texto: "fulltext" usa los índices FULLTEXT ngram de MySQL,
+# "legacy" conserva la búsqueda por subcadena con ILIKE '%texto%'
+TASK_SEARCH_MODE = os.getenv("TASK_SEARCH_MODE", "fulltext").lower()
+# Debe coincidir con ngram_token_size del servidor MySQL (2 por defecto)
+NGRAM_TOKEN_SIZE = int(os.getenv("NGRAM_TOKEN_SIZE", 2))
+
+# Quita las comillas para poder buscar el texto como frase
+def _clean(term: str) -> str:
+    return " ".join(term.replace('"', " ").split())
+
+# Indica si se puede usar el índice FULLTEXT para este texto
+def _use_fulltext(term: str, mode: str = None) -> bool:
+    mode = (mode or TASK_SEARCH_MODE).lower()
+    # los textos más cortos que un ngram no se encuentran en el índice, se buscan con ILIKE
+    return mode == "fulltext" and engine.dialect.name == "mysql" and len(_clean(term)) >= NGRAM_TOKEN_SIZE
+
+# Frase en modo booleano: con ngram equivale a buscar la subcadena
+def _phrase(term: str) -> str:
+    return f'"{_clean(term)}"'
+
+# Filtro por título o descripción (getAllTasks)
+def title_or_description_filter(term: str, mode: str = None):
+    if _use_fulltext(term, mode):
+        return match(models.Task.title, models.Task.description, against=_phrase(term)).in_boolean_mode()
+    search_term = f"%{term}%"
+    return or_(
+        models.Task.title.ilike(search_term),
+        models.Task.description.ilike(search_term)
+    )
+
+# Filtro por título (getTaskByTitle)
+def title_filter(term: str, mode: str = None):
+    if _use_fulltext(term, mode):
+        return match(models.Task.title, against=_phrase(term)).in_boolean_mode()
+    return models.Task.title.ilike(f"%{term}%")
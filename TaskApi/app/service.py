@@ -7,9 +7,8 @@ from werkzeug.routing import Map, Rule
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 import json
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from .database import SessionLocal
-from . import models
+from . import models, search, pagination, counts
 from .validators import validate_title, validate_end_date, validate_task_id, validate_task_exists
 import math
 
@@ -32,6 +31,8 @@ class PaginatedTaskResponse(ComplexModel):
     pageSize = Integer
     totalTasks = Integer
     totalPages = Integer
+    # cursor para pedir la siguiente página, vacío si es la última
+    nextCursor = Unicode
 
 # Servicio SOAP que contiene todos los métodos
 class TaskService(ServiceBase):
@@ -57,6 +58,8 @@ class TaskService(ServiceBase):
             #carga los datos en una nueva tarea
             db.add(new_task)
             db.commit()
+            # los totales guardados ya no son válidos (en todos los workers)
+            counts.bump(db)
             db.refresh(new_task)
             # Regresa la estructura que anteriormente se definió con los datos de entrada del usuario
             return TaskModel(
@@ -94,6 +97,29 @@ class TaskService(ServiceBase):
         finally:
             db.close()
 
+#get tasks by ids
+    @rpc(Array(Integer), _returns=Array(TaskModel))
+    def getTasksByIds(ctx, task_ids):
+        # Si no vienen ids no se consulta la base de datos
+        ids = [task_id for task_id in (task_ids or []) if task_id is not None]
+        if not ids:
+            return []
+        # Inicia la sesion con la base de datos
+        db: Session = SessionLocal()
+        try:
+            # Busca todas las tareas en una sola consulta, los ids que no existen se omiten
+            tasks = db.query(models.Task).filter(models.Task.id.in_(ids)).all()
+            return [TaskModel(
+                id=t.id,
+                title=t.title,
+                description=t.description,
+                isCompleted=t.isCompleted,
+                endDate=t.endDate
+            ) for t in tasks]
+        #cierra la sesión con la base de datos
+        finally:
+            db.close()
+
 #get task by title
     @rpc(Unicode(min_occurs=1), _returns=Array(TaskModel))
     def getTaskByTitle(ctx, title):
@@ -101,7 +127,7 @@ class TaskService(ServiceBase):
         db: Session = SessionLocal()
         try:
             # Busca la tarea por título
-            tasks = db.query(models.Task).filter(models.Task.title.ilike(f"%{title}%")).all()
+            tasks = db.query(models.Task).filter(search.title_filter(title)).all()
             #regresa una todas de tareas que coinciden con el título solicitado
             return [TaskModel(
                 id=t.id,
@@ -114,6 +140,28 @@ class TaskService(ServiceBase):
         finally:
             db.close()
 
+#get task by exact title
+    @rpc(Unicode(min_occurs=1), _returns=Array(TaskModel))
+    def getTaskByExactTitle(ctx, title):
+        # Inicia la sesion con la base de datos
+        db: Session = SessionLocal()
+        try:
+            # Busca por el título normalizado, usa el índice ix_tasks_title_normalized
+            tasks = db.query(models.Task).filter(
+                models.Task.title_normalized == models.normalize_title(title)
+            ).all()
+            #regresa las tareas con exactamente ese título (sin importar mayúsculas)
+            return [TaskModel(
+                id=t.id,
+                title=t.title,
+                description=t.description,
+                isCompleted=t.isCompleted,
+                endDate=t.endDate
+            ) for t in tasks]
+        #cierra la sesión con la base de datos
+        finally:
+            db.close()
+
 #get all tasks
     @rpc(
         Integer(min_occurs=0, default=1),    # page
@@ -121,53 +169,50 @@ class TaskService(ServiceBase):
         Unicode(min_occurs=0, nillable=True), # filter 
         Unicode(min_occurs=0, nillable=True), # sortBy 
         Unicode(min_occurs=0, default='asc'), # sortOrder 
+        Unicode(min_occurs=0, nillable=True), # cursor (nextCursor de la página anterior)
+        Boolean(min_occurs=0, default=True),  # includeTotal
         _returns=PaginatedTaskResponse
     )
-    def getAllTasks(ctx, page=1, pageSize=10, filter=None, sortBy=None, sortOrder='asc'):
+    def getAllTasks(ctx, page=1, pageSize=10, filter=None, sortBy=None, sortOrder='asc', cursor=None, includeTotal=True):
         # Inicia la sesion con la base de datos
         db: Session = SessionLocal()
         try:
             # Asegurar valores válidos para paginación
             page = page if page and page > 0 else 1
             pageSize = pageSize if pageSize and pageSize > 0 else 10
+            desc = (sortOrder or 'asc').lower() == 'desc'
+            column = pagination.sort_column(sortBy)
 
             # Consulta base
             query = db.query(models.Task)
 
             # Aplicar filtro 
             if filter:
-                search_term = f"%{filter}%"
-                # Busca en título o descripción 
-                query = query.filter(
-                    or_(
-                        models.Task.title.ilike(search_term),
-                        models.Task.description.ilike(search_term)
-                    )
-                )
-
-            # Obtener el conteo total después de filtrar
-            total_tasks = query.count()
+                # Busca en título o descripción (FULLTEXT o ILIKE según TASK_SEARCH_MODE)
+                query = query.filter(search.title_or_description_filter(filter))
 
-            # Aplicar ordenamiento 
-            if sortBy and hasattr(models.Task, sortBy):
-                column = getattr(models.Task, sortBy)
-                if sortOrder.lower() == 'desc':
-                    query = query.order_by(column.desc())
-                else:
-                    query = query.order_by(column.asc())
-            else:
-                # Orden por defecto 
-                query = query.order_by(models.Task.id.asc())
+            # Obtener el conteo total después de filtrar (opcional, se guarda en caché por filtro)
+            total_tasks = counts.count_tasks(db, query, filter) if includeTotal is not False else None
 
-            # Aplicar paginación 
-            offset = (page - 1) * pageSize
-            query = query.offset(offset).limit(pageSize)
+            # Aplicar ordenamiento, con id para desempatar
+            query = query.order_by(*pagination.order_by(column, desc))
 
-            # Consulta final
-            tasks = query.all()
+            # Aplicar paginación: con cursor se busca desde la última tarea, si no con offset
+            if cursor:
+                value, last_id = pagination.decode_cursor(cursor, column, desc)
+                query = query.filter(pagination.keyset_filter(column, value, last_id, desc))
+                page = None
+            else:
+                query = query.offset((page - 1) * pageSize)
+            # una tarea de más para saber si hay otra página
+            tasks = query.limit(pageSize + 1).all()
+            next_cursor = None
+            if len(tasks) > pageSize:
+                tasks = tasks[:pageSize]
+                next_cursor = pagination.encode_cursor(tasks[-1], column, desc)
 
             # Calcular total de páginas
-            total_pages = math.ceil(total_tasks / pageSize) if pageSize > 0 else 0
+            total_pages = math.ceil(total_tasks / pageSize) if total_tasks is not None else None
 
             # Formatear la respuesta, regresa la tarea y los datos de paginación
             task_models = [TaskModel(
@@ -183,7 +228,8 @@ class TaskService(ServiceBase):
                 page=page,
                 pageSize=pageSize,
                 totalTasks=total_tasks,
-                totalPages=total_pages
+                totalPages=total_pages,
+                nextCursor=next_cursor
             )
         #cierra la sesión con la base de datos
         finally:
@@ -210,6 +256,8 @@ class TaskService(ServiceBase):
             task.endDate = endDate
             # Guarda los cambios en la base de datos
             db.commit()
+            # el título o la descripción pudieron cambiar los totales con filtro
+            counts.bump(db, rows=False, content=True)
             db.refresh(task)
             # Regresa la estructura con los datos actualizados de la tarea
             return TaskModel(
@@ -248,6 +296,9 @@ class TaskService(ServiceBase):
                 task.endDate = endDate
             # Guarda los cambios en la base de datos    
             db.commit()
+            # el título o la descripción pudieron cambiar los totales con filtro
+            if title is not None or description:
+                counts.bump(db, rows=False, content=True)
             db.refresh(task)
             # Regresa la estructura con los datos actualizados de la tarea
             return TaskModel(
@@ -276,6 +327,8 @@ class TaskService(ServiceBase):
             # Elimina la tarea de la base de datos
             db.delete(task)
             db.commit()
+            # los totales guardados ya no son válidos (en todos los workers)
+            counts.bump(db)
             return f"Tarea {task_id} eliminada correctamente"
         #cierra la sesión con la base de datos
         finally:
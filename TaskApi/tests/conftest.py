@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Para importar el paquete app desde TaskApi
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base en memoria para las pruebas (sin MySQL)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,75 @@
+import datetime
+
+import pytest
+from spyne import Fault
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, pagination
+
+# SQLite ordena los NULL igual que MySQL: primero en asc y al final en desc
+engine = create_engine("sqlite://")
+models.Base.metadata.create_all(engine)
+Session = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def db():
+    session = Session()
+    # valores repetidos y NULL para probar los desempates por id
+    for i in range(1, 24):
+        session.add(models.Task(
+            title=f"Tarea {i % 5}",
+            description=None if i % 4 == 0 else f"desc {i % 3}",
+            isCompleted=i % 2 == 0,
+            endDate=datetime.date(2030, 1, 1) + datetime.timedelta(days=i % 6),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+# Recorre todas las páginas con el cursor y devuelve los ids en orden
+def walk(db, sortBy, desc, page_size=4):
+    column = pagination.sort_column(sortBy)
+    ids, cursor = [], None
+    while True:
+        query = db.query(models.Task)
+        if cursor:
+            value, last_id = pagination.decode_cursor(cursor, column, desc)
+            query = query.filter(pagination.keyset_filter(column, value, last_id, desc))
+        page = query.order_by(*pagination.order_by(column, desc)).limit(page_size).all()
+        ids += [task.id for task in page]
+        if len(page) < page_size:
+            return ids
+        cursor = pagination.encode_cursor(page[-1], column, desc)
+
+
+@pytest.mark.parametrize("sortBy", ["id", "title", "description", "isCompleted", "endDate", "noExiste"])
+@pytest.mark.parametrize("desc", [False, True])
+def test_keyset_pages_match_full_order(db, sortBy, desc):
+    column = pagination.sort_column(sortBy)
+    expected = [task.id for task in db.query(models.Task).order_by(*pagination.order_by(column, desc))]
+    assert walk(db, sortBy, desc) == expected
+
+
+def test_cursor_from_other_order_is_rejected(db):
+    task = db.query(models.Task).first()
+    cursor = pagination.encode_cursor(task, models.Task.title, False)
+    with pytest.raises(Fault) as error:
+        pagination.decode_cursor(cursor, models.Task.title, True)
+    assert error.value.faultcode == "Client.InvalidCursor"
+    with pytest.raises(Fault):
+        pagination.decode_cursor(cursor, models.Task.endDate, False)
+
+
+@pytest.mark.parametrize("cursor", ["", "no-es-base64!", "eyJ4IjoxfQ"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(Fault):
+        pagination.decode_cursor(cursor, models.Task.id, False)
+
+
+def test_date_cursor_round_trip(db):
+    task = db.query(models.Task).first()
+    cursor = pagination.encode_cursor(task, models.Task.endDate, True)
+    assert pagination.decode_cursor(cursor, models.Task.endDate, True) == (task.endDate, task.id)
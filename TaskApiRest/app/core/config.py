@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 # Configuración de la aplicación
@@ -10,6 +11,80 @@ class Settings(BaseSettings):
     HYDRA_CLIENT_ID: str
     HYDRA_CLIENT_SECRET: str
 
+    # Caché de introspección de tokens (segundos)
+    INTROSPECTION_CACHE_TTL: int = 300
+    INTROSPECTION_NEGATIVE_TTL: int = 30
+    INTROSPECTION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Cliente HTTP de Hydra (pool de conexiones y timeouts en segundos)
+    HYDRA_HTTP_MAX_CONNECTIONS: int = 100
+    HYDRA_HTTP_MAX_KEEPALIVE: int = 20
+    HYDRA_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HYDRA_HTTP_TIMEOUT: float = 2.0
+    HYDRA_HTTP_CONNECT_TIMEOUT: float = 1.0
+    HYDRA_HTTP2: bool = True
+
+    # Cliente HTTP del servicio SOAP (pool de conexiones y timeouts por llamada en segundos)
+    SOAP_HTTP_MAX_CONNECTIONS: int = 200
+    SOAP_HTTP_MAX_KEEPALIVE: int = 50
+    SOAP_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SOAP_HTTP_TIMEOUT: float = 10.0
+    SOAP_HTTP_CONNECT_TIMEOUT: float = 2.0
+    # Caché persistente del WSDL/XSD (segundos), la carpeta es un volumen en docker-compose
+    SOAP_WSDL_CACHE_PATH: str = "/var/cache/taskapi/zeep_wsdl_cache.db"
+    SOAP_WSDL_CACHE_TTL: int = 3600
+    # Versión del servicio SOAP desplegado, forma parte del nombre del caché del WSDL
+    SOAP_SERVICE_VERSION: str = ""
+    # Si no se pudo crear el cliente, las peticiones fallan rápido durante este tiempo (segundos)
+    SOAP_INIT_RETRY_INTERVAL: float = 5.0
+
+    # Canal gRPC (keepalive en ms, deadlines en segundos)
+    GRPC_KEEPALIVE_TIME_MS: int = 30000
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = 10000
+    GRPC_READ_TIMEOUT: float = 5.0
+    GRPC_WRITE_TIMEOUT: float = 10.0
+    GRPC_BULK_TIMEOUT: float = 60.0
+    # Deadline del stream completo de ListProjects, sin límite por defecto
+    GRPC_STREAM_TIMEOUT: Optional[float] = None
+    GRPC_RETRY_MAX_ATTEMPTS: int = 3
+    GRPC_GZIP: bool = False
+
+    # Filtro de Bloom para descartar ids inexistentes (apagado por defecto)
+    BLOOM_FILTER_ENABLED: bool = False
+    BLOOM_FILTER_BITS: int = 16777216
+    BLOOM_FILTER_HASHES: int = 7
+    BLOOM_FILTER_REBUILD_LOCK_TTL: int = 600
+    # El filtro expira y se reconstruye para incluir ids creados fuera de este gateway (segundos)
+    BLOOM_FILTER_MAX_AGE: int = 600
+    BLOOM_FILTER_REBUILD_INTERVAL: int = 30
+
+    # Índice de títulos de tareas en Redis para validar conflictos sin llamar al soap.
+    # Apagado por defecto: con el índice listo un título que no está se toma como libre, así que
+    # solo se debe activar si todas las escrituras pasan por este gateway.
+    TITLE_INDEX_ENABLED: bool = False
+    # el lock se renueva en cada lote mientras dura la reconstrucción
+    TITLE_INDEX_REBUILD_LOCK_TTL: int = 600
+    # El índice expira y se reconstruye en la siguiente validación (segundos)
+    TITLE_INDEX_MAX_AGE: int = 300
+
+    # Máximo de ids en los endpoints /batch
+    BATCH_MAX_IDS: int = 100
+
+    # Importación masiva por lotes (tamaño de lote, lotes en paralelo y vida del estado en segundos)
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    BULK_IMPORT_MAX_CONCURRENCY: int = 4
+    BULK_IMPORT_STATE_TTL: int = 86400
+
+    # Modo de autenticación: "introspection" (Hydra) o "jwt" (verificación local)
+    AUTH_MODE: str = "introspection"
+    # Por defecto se usa HYDRA_PUBLIC_URL/.well-known/jwks.json
+    JWKS_URL: Optional[str] = None
+    JWKS_REFRESH_INTERVAL: int = 300
+    JWKS_MIN_REFRESH_INTERVAL: int = 10
+    JWT_ALGORITHMS: str = "RS256,ES256"
+    JWT_ISSUER: Optional[str] = None
+    JWT_AUDIENCE: Optional[str] = None
+
 # Lee variables de entorno desde un archivo .env
     class Config:
         env_file = ".env"
@@ -0,0 +1,50 @@
+import httpx
+from typing import Optional
+from app.core.config import settings
+
+# Cliente HTTP compartido para Hydra (se crea en el lifespan)
+_hydra_client: Optional[httpx.AsyncClient] = None
+
+# Construye un cliente asíncrono con pool de conexiones y timeouts estrictos
+def build_async_client(
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    timeout: float,
+    connect_timeout: float,
+    http2: bool = False,
+) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    timeouts = httpx.Timeout(timeout, connect=connect_timeout, pool=connect_timeout)
+    return httpx.AsyncClient(limits=limits, timeout=timeouts, http2=http2)
+
+# Crea el cliente de Hydra
+def init_hydra_client() -> httpx.AsyncClient:
+    global _hydra_client
+    if _hydra_client is None:
+        _hydra_client = build_async_client(
+            max_connections=settings.HYDRA_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HYDRA_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HYDRA_HTTP_KEEPALIVE_EXPIRY,
+            timeout=settings.HYDRA_HTTP_TIMEOUT,
+            connect_timeout=settings.HYDRA_HTTP_CONNECT_TIMEOUT,
+            http2=settings.HYDRA_HTTP2,
+        )
+    return _hydra_client
+
+# Obtener el cliente de Hydra (lo crea si el lifespan no corrió)
+def get_hydra_client() -> httpx.AsyncClient:
+    if _hydra_client is None:
+        return init_hydra_client()
+    return _hydra_client
+
+# Cierra el cliente y sus conexiones
+async def close_hydra_client():
+    global _hydra_client
+    if _hydra_client is not None:
+        await _hydra_client.aclose()
+        _hydra_client = None
@@ -0,0 +1,33 @@
+import threading
+from typing import Dict
+
+# Contadores en memoria (uno por worker de uvicorn)
+_counters: Dict[str, int] = {}
+_lock = threading.Lock()
+
+# Incrementa un contador
+def incr(name: str, amount: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+# Obtener el valor de un contador
+def get_counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+# Tasa de aciertos de un caché a partir de <prefix>_hits y <prefix>_misses
+def hit_ratio(prefix: str) -> float:
+    with _lock:
+        hits = _counters.get(f"{prefix}_hits", 0)
+        misses = _counters.get(f"{prefix}_misses", 0)
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+# Copia de todos los contadores y las tasas de aciertos
+def snapshot() -> Dict[str, float]:
+    with _lock:
+        data = dict(_counters)
+    prefixes = {name[:-len("_misses")] for name in data if name.endswith("_misses")}
+    for prefix in prefixes:
+        data[f"{prefix}_hit_ratio"] = hit_ratio(prefix)
+    return data
@@ -2,6 +2,9 @@ import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.http_client import get_hydra_client
+from app.dependencies.token_cache import get_cached_introspection, store_introspection
+from app.dependencies.jwks import verify_jwt, token_scopes
 
 #punto público
 INTROSPECT_URL = f"{settings.HYDRA_ADMIN_URL}/admin/oauth2/introspect" 
@@ -11,50 +14,67 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # Verifica el token con Hydra
 async def check_scope(token: str, required_scope: str) -> bool:
-  # Llama al endpoint de introspección de Hydra
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                INTROSPECT_URL,
-                # Autenticarse como machine-client
-                auth=(settings.HYDRA_CLIENT_ID, settings.HYDRA_CLIENT_SECRET),
-                data={"token": token},
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            
-            response.raise_for_status() 
-            
-            # Datos de introspección
-            introspection_data = response.json()
+    # Primero revisa el caché de introspección
+    cached = await get_cached_introspection(token)
+    if cached is not None:
+        return cached["active"] and required_scope in cached["scopes"]
+
+  # Llama al endpoint de introspección de Hydra con el cliente compartido
+    client = get_hydra_client()
+    try:
+        response = await client.post(
+            INTROSPECT_URL,
+            # Autenticarse como machine-client
+            auth=(settings.HYDRA_CLIENT_ID, settings.HYDRA_CLIENT_SECRET),
+            data={"token": token},
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        response.raise_for_status() 
+        
+        # Datos de introspección
+        introspection_data = response.json()
+        # Guarda el resultado para las siguientes peticiones
+        await store_introspection(token, introspection_data)
+        
+        # Si el token no está activo, la validación falla
+        if not introspection_data.get("active", False):
+            return False
             
-            # Si el token no está activo, la validación falla
-            if not introspection_data.get("active", False):
-                return False
-                
-            # Verifica si el scope requerido está en la lista de scopes del token
-            token_scopes = introspection_data.get("scope", "").split(" ")
-            return required_scope in token_scopes
+        # Verifica si el scope requerido está en la lista de scopes del token
+        token_scopes = introspection_data.get("scope", "").split(" ")
+        return required_scope in token_scopes
 
-        except httpx.RequestError as e:
-            # Error de red al contactar Hydra
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Authentication service {e}"
-            )
-        except httpx.HTTPStatusError as e:
-            # si client_id o secret son incorrectos
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"client_id o secret incorrecto {e.response.text}"
-            )
+    except httpx.RequestError as e:
+        # Error de red al contactar Hydra
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Authentication service {e}"
+        )
+    except httpx.HTTPStatusError as e:
+        # si client_id o secret son incorrectos
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"client_id o secret incorrecto {e.response.text}"
+        )
+
+# Verifica el token localmente contra el JWKS de Hydra
+async def check_scope_jwt(token: str, required_scope: str) -> bool:
+    claims = await verify_jwt(token)
+    if claims is None:
+        return False
+    return required_scope in token_scopes(claims)
 
 def get_auth_dependency(required_scope: str):
+    # El modo se elige por despliegue con AUTH_MODE
+    verify = check_scope_jwt if settings.AUTH_MODE == "jwt" else check_scope
+
     # Autenticación que verifica el scope requerido
     async def auth_check(token: str = Depends(oauth2_scheme)):
         is_valid = False 
         try:
             # Verifica el scope del token
-            is_valid = await check_scope(token, required_scope)
+            is_valid = await verify(token, required_scope)
         except HTTPException as e:
             raise e
         except Exception as e:
@@ -0,0 +1,117 @@
+from redis.asyncio import Redis
+import asyncio
+import hashlib
+from typing import AsyncIterator
+from app.core.config import settings
+from app.core import metrics
+
+# Filtro de Bloom en un bitmap de Redis (SETBIT/GETBIT) para descartar ids que no existen.
+# Solo se aplica cuando el bit de "listo" está encendido; ese bit vive en el mismo bitmap,
+# así que si Redis expulsa la clave el filtro deja de aplicarse en lugar de dar falsos negativos.
+# La clave expira después de BLOOM_FILTER_MAX_AGE y se vuelve a llenar, así los ids creados
+# directamente en el upstream (sin pasar por este gateway) solo dan 404 por un tiempo acotado.
+class BloomFilter:
+    def __init__(self, name: str):
+        self.key = f"bloom:{name}"
+        self.bits = settings.BLOOM_FILTER_BITS
+        self.hashes = settings.BLOOM_FILTER_HASHES
+        # el bit de listo va después de las posiciones de los hashes
+        self.ready_offset = self.bits
+
+    # Posiciones del id en el bitmap (doble hashing sobre sha256)
+    def _offsets(self, item) -> list:
+        digest = hashlib.sha256(str(item).encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    async def _set_bits(self, redis_conn: Redis, items):
+        pipe = redis_conn.pipeline(transaction=False)
+        for item in items:
+            for offset in self._offsets(item):
+                pipe.setbit(self.key, offset, 1)
+        await pipe.execute()
+
+    # Agrega ids al filtro (siempre, aunque no esté listo)
+    async def add(self, redis_conn: Redis, *items):
+        if not settings.BLOOM_FILTER_ENABLED or not items:
+            return
+        try:
+            await self._set_bits(redis_conn, items)
+        except Exception as e:
+            print(f"Error adding to bloom filter {self.key}: {e}")
+
+    # False solo si el filtro está listo y el id seguro no existe
+    async def might_contain(self, redis_conn: Redis, item) -> bool:
+        if not settings.BLOOM_FILTER_ENABLED:
+            return True
+        try:
+            pipe = redis_conn.pipeline(transaction=False)
+            pipe.getbit(self.key, self.ready_offset)
+            for offset in self._offsets(item):
+                pipe.getbit(self.key, offset)
+            ready, *bits = await pipe.execute()
+        except Exception as e:
+            # sin Redis no se descarta nada
+            print(f"Error reading bloom filter {self.key}: {e}")
+            return True
+        if not ready or all(bits):
+            return True
+        metrics.incr("bloom_filter_rejects")
+        return False
+
+    # Indica si el filtro ya se llenó con los ids existentes
+    async def is_ready(self, redis_conn: Redis) -> bool:
+        return bool(await redis_conn.getbit(self.key, self.ready_offset))
+
+    # Llena el filtro con todos los ids del upstream y lo marca como listo
+    # (si algo falla se propaga el error y el filtro no se marca como listo)
+    async def rebuild(self, redis_conn: Redis, ids: AsyncIterator, batch_size: int = 500):
+        batch = []
+        count = 0
+        async for item in ids:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await self._set_bits(redis_conn, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await self._set_bits(redis_conn, batch)
+            count += len(batch)
+        pipe = redis_conn.pipeline(transaction=True)
+        pipe.setbit(self.key, self.ready_offset, 1)
+        pipe.expire(self.key, settings.BLOOM_FILTER_MAX_AGE)
+        await pipe.execute()
+        print(f"Bloom filter {self.key} listo con {count} ids")
+
+
+# Filtros para tasks y projects
+tasks_filter = BloomFilter("tasks")
+projects_filter = BloomFilter("projects")
+
+# Reconstruye el filtro si no está listo (un solo worker a la vez)
+async def rebuild_if_needed(redis_conn: Redis, bloom: BloomFilter, ids_factory):
+    if not settings.BLOOM_FILTER_ENABLED:
+        return
+    try:
+        if await bloom.is_ready(redis_conn):
+            return
+        lock = redis_conn.lock(f"lock:{bloom.key}:rebuild", timeout=settings.BLOOM_FILTER_REBUILD_LOCK_TTL, blocking=False)
+        if not await lock.acquire():
+            return
+        try:
+            await bloom.rebuild(redis_conn, ids_factory())
+        finally:
+            try:
+                await lock.release()
+            except Exception as e:
+                print(f"Error releasing bloom filter lock {e}")
+    except Exception as e:
+        # el filtro sigue sin aplicarse hasta el siguiente intento
+        print(f"Error rebuilding bloom filter {bloom.key}: {e}")
+
+# Revisa periódicamente el filtro y lo reconstruye cuando expira (se lanza en el lifespan)
+async def rebuild_loop(redis_conn: Redis, bloom: BloomFilter, ids_factory):
+    while True:
+        await rebuild_if_needed(redis_conn, bloom, ids_factory)
+        await asyncio.sleep(settings.BLOOM_FILTER_REBUILD_INTERVAL)
@@ -1,110 +1,509 @@
-from redis import Redis
+from redis.asyncio import Redis, ConnectionPool
+from redis.exceptions import WatchError
+import asyncio
 import json
-from typing import Any, Optional
+import orjson
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import os
-from functools import lru_cache
+import time
+import threading
+from collections import OrderedDict
+from app.core import metrics
+from app.dependencies.cache_codec import encode_entry, decode_entry, dumps
 
 # Configuración de Redis
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 100))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
 
-# Pool de conexiones Redis (singleton)
-_redis_connection = None
+# Configuración del caché local (L1) de cada worker
+L1_CACHE_MAX_ENTRIES = int(os.getenv("L1_CACHE_MAX_ENTRIES", 2048))
+L1_CACHE_TTL = float(os.getenv("L1_CACHE_TTL", 5))
+# Canal de pub/sub para invalidar el L1 de todos los workers
+INVALIDATION_CHANNEL = "cache_invalidation"
 
-# Obtener conexión a Redis con caching
-@lru_cache()
-def get_redis_connection() -> Redis:
-    # setup de la conexión a Redis
+# Stale-while-revalidate: después del soft TTL se recalcula, hasta el hard TTL se sirve lo viejo
+CACHE_SOFT_TTL = int(os.getenv("CACHE_SOFT_TTL", 300))
+CACHE_HARD_TTL = int(os.getenv("CACHE_HARD_TTL", 3600))
+# Lock para que solo una petición recalcule la entrada
+CACHE_LOCK_TTL = float(os.getenv("CACHE_LOCK_TTL", 10))
+CACHE_LOCK_WAIT = float(os.getenv("CACHE_LOCK_WAIT", 2))
+
+# Caché negativo: los ids que no existen se recuerdan por poco tiempo
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", 30))
+
+# Cliente asíncrono de Redis con pool de conexiones (singleton, se crea en el lifespan)
+_redis_connection: Optional[Redis] = None
+
+# Crea el pool y el cliente de Redis
+def init_redis_connection() -> Redis:
     global _redis_connection
     if _redis_connection is None:
+        pool = ConnectionPool(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            # se trabaja con bytes para guardar el JSON ya serializado
+            decode_responses=False,
+            socket_connect_timeout=5,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            retry_on_timeout=True
+        )
+        _redis_connection = Redis(connection_pool=pool)
+    return _redis_connection
+
+# Obtener conexión a Redis (dependencia de FastAPI)
+async def get_redis_connection() -> Redis:
+    return init_redis_connection()
+
+# Cierra el cliente y el pool
+async def close_redis_connection():
+    global _redis_connection
+    if _redis_connection is not None:
+        await _redis_connection.aclose()
+        _redis_connection = None
+
+# Caché local LRU (clave -> (expira, valor))
+_local_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_local_lock = threading.Lock()
+
+def _get_local(key: str) -> Optional[Any]:
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        # si ya expiró se elimina
+        if expires_at <= time.monotonic():
+            del _local_cache[key]
+            return None
+        _local_cache.move_to_end(key)
+        return value
+
+def _set_local(key: str, value: Any, ttl: float):
+    with _local_lock:
+        _local_cache[key] = (time.monotonic() + min(ttl, L1_CACHE_TTL), value)
+        _local_cache.move_to_end(key)
+        # expulsar las entradas menos usadas si se pasa del límite
+        while len(_local_cache) > L1_CACHE_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+# Elimina claves del L1 ("*" limpia todo)
+def evict_local(*keys: str):
+    with _local_lock:
+        if "*" in keys:
+            _local_cache.clear()
+            return
+        for key in keys:
+            _local_cache.pop(key, None)
+
+# Elimina del L1 local y avisa a los demás workers
+async def _publish_invalidation(redis_conn: Redis, *keys: str):
+    evict_local(*keys)
+    try:
+        await redis_conn.publish(INVALIDATION_CHANNEL, json.dumps(list(keys)))
+    except Exception as e:
+        print(f"Error publishing invalidation: {e}")
+
+# Listener de invalidaciones (una tarea por worker, se arranca en el lifespan)
+async def invalidation_listener(redis_conn: Redis):
+    while True:
+        pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
         try:
-            # Crear la conexión
-            _redis_connection = Redis(
-                host=REDIS_HOST,
-                port=REDIS_PORT,
-                db=REDIS_DB,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                retry_on_timeout=True
-            )
-            # Test the connection
-            _redis_connection.ping()
-        except Exception as e:
-            print(f"Error: {e}")
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                try:
+                    evict_local(*json.loads(message["data"]))
+                except Exception as e:
+                    print(f"Error processing invalidation: {e}")
+        except asyncio.CancelledError:
             raise
-    return _redis_connection
+        except Exception as e:
+            # si se pierde la conexión se limpia el L1 y se vuelve a suscribir
+            print(f"Error in invalidation listener: {e}")
+            evict_local("*")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+# Lee una entrada del L1 o de Redis
+async def _get_entry(key: str, redis_conn: Redis) -> Optional[Tuple[float, bytes]]:
+    local_value = _get_local(key)
+    if isinstance(local_value, tuple):
+        metrics.incr("cache_l1_hits")
+        return local_value
+    metrics.incr("cache_l1_misses")
+
+    try:
+        entry = decode_entry(await redis_conn.get(key))
+    except Exception as e:
+        print(f"Error getting cache for key {key}: {e}")
+        return None
+    if entry is None:
+        metrics.incr("cache_redis_misses")
+        return None
+    metrics.incr("cache_redis_hits")
+    _set_local(key, entry, L1_CACHE_TTL)
+    return entry
 
-# Funciones de caché genéricas
-def set_cache(key: str, value: dict, redis_conn: Redis, ttl: int = 3600):
+# Guarda la entrada en Redis (hasta el hard TTL) y en el L1
+async def _store_entry(key: str, payload: bytes, redis_conn: Redis, soft_ttl: int, hard_ttl: int):
+    entry = (time.time() + soft_ttl, payload)
     try:
-        redis_conn.setex(key, ttl, json.dumps(value, default=str))
+        await redis_conn.setex(key, hard_ttl, encode_entry(*entry))
+        _set_local(key, entry, hard_ttl)
     except Exception as e:
         print(f"Error setting cache for key {key}: {e}")
 
-def get_cache(key: str, redis_conn: Redis) -> Optional[dict]:
-    # Obtener datos de caché
+# Recalcula la entrada y la guarda con su soft TTL
+async def _refresh_entry(key: str, compute: Callable[[], Awaitable[Any]], redis_conn: Redis, soft_ttl: int, hard_ttl: int) -> bytes:
+    payload = dumps(await compute())
+    await _store_entry(key, payload, redis_conn, soft_ttl, hard_ttl)
+    return payload
+
+# Obtiene el JSON de una entrada o lo recalcula una sola vez (single-flight)
+async def _get_or_compute_payload(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    redis_conn: Redis,
+    soft_ttl: int,
+    hard_ttl: int,
+) -> bytes:
+    cached = await _get_entry(key, redis_conn)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
     try:
-        cached_data = redis_conn.get(key)
-        if cached_data:
-            return json.loads(cached_data)
+        lock = redis_conn.lock(f"lock:{key}", timeout=CACHE_LOCK_TTL, blocking=False)
+        acquired = await lock.acquire()
+    except Exception as e:
+        # sin Redis se recalcula directamente
+        print(f"Error acquiring cache lock for key {key}: {e}")
+        return dumps(await compute())
+
+    if acquired:
+        try:
+            return await _refresh_entry(key, compute, redis_conn, soft_ttl, hard_ttl)
+        except Exception as e:
+            # si hay una versión vieja se sirve mientras el upstream falla (solo errores 5xx)
+            if cached and getattr(e, "status_code", 500) >= 500:
+                print(f"Error refreshing cache for key {key}: {e}")
+                metrics.incr("cache_stale_served")
+                return cached[1]
+            raise
+        finally:
+            try:
+                await lock.release()
+            except Exception as e:
+                # el lock expira solo por su TTL
+                print(f"Error releasing cache lock for key {key}: {e}")
+
+    # Otra petición está recalculando: se sirve la versión vieja si existe
+    if cached:
+        metrics.incr("cache_stale_served")
+        return cached[1]
+
+    # Si no hay nada se espera a que la otra petición termine
+    deadline = time.monotonic() + CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        cached = await _get_entry(key, redis_conn)
+        if cached:
+            metrics.incr("cache_lock_waits")
+            return cached[1]
+
+    # se agotó la espera, se recalcula sin lock
+    return await _refresh_entry(key, compute, redis_conn, soft_ttl, hard_ttl)
+
+# Obtiene una entrada del caché o la recalcula una sola vez (single-flight)
+async def get_or_compute(
+    key: Optional[str],
+    compute: Callable[[], Awaitable[Any]],
+    redis_conn: Redis,
+    soft_ttl: int = CACHE_SOFT_TTL,
+    hard_ttl: int = CACHE_HARD_TTL,
+) -> Any:
+    # sin clave no hay caché
+    if not key:
+        return await compute()
+    return orjson.loads(await _get_or_compute_payload(key, compute, redis_conn, soft_ttl, hard_ttl))
+
+# Igual que get_or_compute pero devuelve el JSON ya serializado (para responder sin revalidar)
+async def get_or_compute_raw(
+    key: Optional[str],
+    compute: Callable[[], Awaitable[Any]],
+    redis_conn: Redis,
+    soft_ttl: int = CACHE_SOFT_TTL,
+    hard_ttl: int = CACHE_HARD_TTL,
+) -> bytes:
+    if not key:
+        return dumps(await compute())
+    return await _get_or_compute_payload(key, compute, redis_conn, soft_ttl, hard_ttl)
+
+# Caché negativo (tombstones) para respuestas 404
+_MISSING = "__missing__"
+
+def _missing_key(key: str) -> str:
+    return f"missing:{key}"
+
+# Indica si la clave se marcó como inexistente hace poco
+async def is_known_missing(key: str, redis_conn: Redis) -> bool:
+    if _get_local(_missing_key(key)) == _MISSING:
+        metrics.incr("negative_cache_hits")
+        return True
+    try:
+        if await redis_conn.exists(_missing_key(key)):
+            metrics.incr("negative_cache_hits")
+            _set_local(_missing_key(key), _MISSING, NEGATIVE_CACHE_TTL)
+            return True
+    except Exception as e:
+        print(f"Error getting negative cache for key {key}: {e}")
+    return False
+
+# Marca claves como inexistentes por NEGATIVE_CACHE_TTL segundos
+async def mark_missing(redis_conn: Redis, *keys: str):
+    if not keys:
+        return
+    try:
+        pipe = redis_conn.pipeline(transaction=False)
+        for key in keys:
+            pipe.setex(_missing_key(key), NEGATIVE_CACHE_TTL, _MISSING)
+            _set_local(_missing_key(key), _MISSING, NEGATIVE_CACHE_TTL)
+        await pipe.execute()
+    except Exception as e:
+        print(f"Error setting negative cache: {e}")
+
+# Quita la marca de inexistente (por ejemplo al crear el recurso)
+async def clear_missing(redis_conn: Redis, *keys: str):
+    if not keys:
+        return
+    missing_keys = [_missing_key(key) for key in keys]
+    try:
+        await redis_conn.delete(*missing_keys)
+    except Exception as e:
+        print(f"Error clearing negative cache: {e}")
+    await _publish_invalidation(redis_conn, *missing_keys)
+
+# Guarda varias entradas (con su soft TTL) en un solo pipeline
+async def store_entries(values: Dict[str, Any], redis_conn: Redis, soft_ttl: int = CACHE_SOFT_TTL, hard_ttl: int = CACHE_HARD_TTL):
+    if not values:
+        return
+    soft_expires = time.time() + soft_ttl
+    try:
+        pipe = redis_conn.pipeline(transaction=False)
+        for key, value in values.items():
+            entry = (soft_expires, dumps(value))
+            pipe.setex(key, hard_ttl, encode_entry(*entry))
+            _set_local(key, entry, hard_ttl)
+        await pipe.execute()
+    except Exception as e:
+        print(f"Error storing cache entries: {e}")
+
+# Obtiene varias entradas con un solo MGET y calcula solo las que faltan
+async def get_or_compute_many(
+    keys: List[str],
+    compute_missing: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+    redis_conn: Redis,
+    soft_ttl: int = CACHE_SOFT_TTL,
+    hard_ttl: int = CACHE_HARD_TTL,
+) -> Dict[str, Any]:
+    now = time.time()
+    results: Dict[str, Any] = {}
+    stale: Dict[str, Any] = {}
+
+    # Primero el caché local
+    pending = []
+    for key in keys:
+        local_value = _get_local(key)
+        if isinstance(local_value, tuple) and local_value[0] > now:
+            metrics.incr("cache_l1_hits")
+            results[key] = orjson.loads(local_value[1])
+        else:
+            metrics.incr("cache_l1_misses")
+            pending.append(key)
+
+    # Después Redis con un solo MGET (entradas y marcas de inexistente)
+    missing = []
+    if pending:
+        try:
+            raw_values = await redis_conn.mget(pending + [_missing_key(key) for key in pending])
+        except Exception as e:
+            print(f"Error getting cache for {len(pending)} keys: {e}")
+            raw_values = [None] * (2 * len(pending))
+        tombstones = raw_values[len(pending):]
+        for key, raw, tombstone in zip(pending, raw_values, tombstones):
+            # ids que no existen no se vuelven a pedir al upstream
+            if tombstone:
+                metrics.incr("negative_cache_hits")
+                continue
+            cached = decode_entry(raw)
+            if cached and cached[0] > now:
+                metrics.incr("cache_redis_hits")
+                results[key] = orjson.loads(cached[1])
+                _set_local(key, cached, L1_CACHE_TTL)
+                continue
+            metrics.incr("cache_redis_misses")
+            if cached:
+                stale[key] = orjson.loads(cached[1])
+            missing.append(key)
+
+    # Solo las claves que faltan van al upstream, en una sola llamada
+    if missing:
+        try:
+            computed = await compute_missing(missing)
+        except Exception as e:
+            # si todas tienen una versión vieja se sirve mientras el upstream falla (solo errores 5xx)
+            if getattr(e, "status_code", 500) >= 500 and all(key in stale for key in missing):
+                print(f"Error refreshing {len(missing)} cache entries: {e}")
+                metrics.incr("cache_stale_served", len(missing))
+                results.update(stale)
+                return results
+            raise
+        await store_entries(computed, redis_conn, soft_ttl, hard_ttl)
+        # las claves que el upstream no devolvió no existen
+        await mark_missing(redis_conn, *[key for key in missing if key not in computed])
+        results.update(computed)
+    return results
+
+# Namespaces versionados para las listas
+TASKS_LIST_NAMESPACE = "tasks_list"
+PROJECTS_LIST_NAMESPACE = "projects_list"
+LIST_NAMESPACES = (TASKS_LIST_NAMESPACE, PROJECTS_LIST_NAMESPACE)
+
+def _version_key(namespace: str) -> str:
+    return f"cache_version:{namespace}"
+
+# Obtener la versión actual de un namespace
+async def get_namespace_version(redis_conn: Redis, namespace: str) -> int:
+    key = _version_key(namespace)
+    version = await redis_conn.get(key)
+    if version is None:
+        # Si la versión se perdió (eviction) se reinicia con el tiempo actual
+        # para no volver a versiones viejas que sigan en Redis
+        await redis_conn.set(key, int(time.time() * 1000), nx=True)
+        version = await redis_conn.get(key)
+    return int(version)
+
+# Cambia la versión del namespace con un solo INCR, las claves viejas expiran por TTL
+async def bump_namespace_version(redis_conn: Redis, namespace: str):
+    key = _version_key(namespace)
+    # asegurar que el contador exista antes de incrementarlo
+    await get_namespace_version(redis_conn, namespace)
+    await redis_conn.incr(key)
+
+# Versión del namespace o None si Redis falla (se lee antes de consultar el upstream)
+async def read_namespace_version(redis_conn: Redis, namespace: str) -> Optional[int]:
+    try:
+        return await get_namespace_version(redis_conn, namespace)
+    except Exception as e:
+        print(f"Error getting cache version for {namespace}: {e}")
         return None
+
+# Guarda las entradas de cada elemento de una lista solo si no hubo escrituras desde que se
+# leyó la versión: un PUT/PATCH/DELETE concurrente cambia la versión y la lista puede traer
+# datos de antes de ese cambio. WATCH cubre también un cambio entre la revisión y el EXEC.
+async def backfill_entries(values: Dict[str, Any], redis_conn: Redis, namespace: str, version: Optional[int],
+                           soft_ttl: int = CACHE_SOFT_TTL, hard_ttl: int = CACHE_HARD_TTL):
+    if not values or version is None:
+        return
+    version_key = _version_key(namespace)
+    soft_expires = time.time() + soft_ttl
+    entries = {key: (soft_expires, dumps(value)) for key, value in values.items()}
+    try:
+        async with redis_conn.pipeline(transaction=True) as pipe:
+            await pipe.watch(version_key)
+            current = await pipe.get(version_key)
+            if current is None or int(current) != version:
+                metrics.incr("cache_backfill_skipped")
+                return
+            pipe.multi()
+            for key, entry in entries.items():
+                pipe.setex(key, hard_ttl, encode_entry(*entry))
+            await pipe.execute()
+    except WatchError:
+        metrics.incr("cache_backfill_skipped")
+        return
     except Exception as e:
-        print(f"Error getting cache for key {key}: {e}")
+        print(f"Error storing cache entries: {e}")
+        return
+    for key, entry in entries.items():
+        _set_local(key, entry, hard_ttl)
+
+# Construye la clave de una lista incluyendo la versión del namespace
+async def build_list_key(redis_conn: Redis, namespace: str, suffix: str) -> Optional[str]:
+    try:
+        version = await get_namespace_version(redis_conn, namespace)
+        return f"{namespace}:v{version}:{suffix}"
+    except Exception as e:
+        # sin versión no se usa caché para no servir datos viejos
+        print(f"Error getting cache version for {namespace}: {e}")
         return None
 
+# Elimina claves por patrón usando SCAN para no bloquear Redis
+async def _delete_by_scan(redis_conn: Redis, pattern: str, batch_size: int = 500):
+    batch = []
+    async for key in redis_conn.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            await redis_conn.unlink(*batch)
+            batch = []
+    if batch:
+        await redis_conn.unlink(*batch)
+
 # Funciones para invalidar caché 
-def invalidate_cache(redis_conn: Redis, pattern: Optional[str] = None):
+async def invalidate_cache(redis_conn: Redis, pattern: Optional[str] = None):
     try:
         if pattern:
-            # Invalidar por patrón específico
-            keys = redis_conn.keys(pattern)
-            if keys:
-                redis_conn.delete(*keys)
+            namespace = pattern.split(":", 1)[0]
+            if namespace in LIST_NAMESPACES and pattern == f"{namespace}:*":
+                # Invalidar listas cambiando la versión
+                await bump_namespace_version(redis_conn, namespace)
+            else:
+                # Invalidar por patrón específico
+                await _delete_by_scan(redis_conn, pattern)
         else:
-            # Invalidar todas las claves tasks y projects
-            task_keys = redis_conn.keys("task:*")
-            project_keys = redis_conn.keys("project:*")
-            task_list_keys = redis_conn.keys("tasks_list:*")
-            project_list_keys = redis_conn.keys("projects_list:*")
-            
-            # Combinar todas las keys
-            all_keys = task_keys + project_keys + task_list_keys + project_list_keys
-            
-            # si hay keys, eliminarlas
-            if all_keys:
-                redis_conn.delete(*all_keys)
+            # Invalidar todas las listas de tasks y projects
+            for namespace in LIST_NAMESPACES:
+                await bump_namespace_version(redis_conn, namespace)
+            # Las claves individuales se borran de forma incremental
+            await _delete_by_scan(redis_conn, "task:*")
+            await _delete_by_scan(redis_conn, "project:*")
+        # Limpiar el L1 de todos los workers
+        await _publish_invalidation(redis_conn, "*")
     except Exception as e:
         print(f"Error: {e}")
 
 # Funciones específicas para invalidar caché de tasks y projects
-def invalidate_task_cache(redis_conn: Redis, task_id: Optional[int] = None):
+async def invalidate_task_cache(redis_conn: Redis, task_id: Optional[int] = None):
     try:
+        # Primero se invalidan las listas de tasks: así una lista que se leyó antes del cambio
+        # ya no puede volver a escribir la entrada que se borra abajo (ver backfill_entries)
+        await bump_namespace_version(redis_conn, TASKS_LIST_NAMESPACE)
+
         if task_id:
             # Invalidar caché específica de una task
             task_key = f"task:{task_id}"
-            redis_conn.delete(task_key)
-        
-        # Siempre invalidar las listas de tasks
-        list_keys = redis_conn.keys("tasks_list:*")
-        if list_keys:
-            redis_conn.delete(*list_keys)
+            await redis_conn.delete(task_key)
+            await _publish_invalidation(redis_conn, task_key)
             
     except Exception as e:
         print(f"Error: {e}")
 
 # Nueva función para invalidar caché de projects para bulk create 
-def invalidate_project_cache(redis_conn: Redis, project_id: Optional[str] = None):
+async def invalidate_project_cache(redis_conn: Redis, project_id: Optional[str] = None):
     try:
+        # Primero se invalidan las listas de projects: así una lista que se leyó antes del cambio
+        # ya no puede volver a escribir la entrada que se borra abajo (ver backfill_entries)
+        await bump_namespace_version(redis_conn, PROJECTS_LIST_NAMESPACE)
+
         if project_id:
             # Invalidar caché específica de un project
             project_key = f"project:{project_id}"
-            redis_conn.delete(project_key)
-        
-        # Siempre invalidar las listas de projects
-        list_keys = redis_conn.keys("projects_list:*")
-        if list_keys:
-            redis_conn.delete(*list_keys)
+            await redis_conn.delete(project_key)
+            await _publish_invalidation(redis_conn, project_key)
             
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import zlib
+import orjson
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# msgpack y zstandard son opcionales, solo se usan si están instalados y configurados
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Configuración del formato de los valores en Redis
+CACHE_CODEC = os.getenv("CACHE_CODEC", "json")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "none")
+# Solo se comprimen los valores de este tamaño o más (bytes)
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", 1024))
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", 3))
+
+# Formato de un valor: b"<codec><compresión><soft_expires>|<cuerpo>"
+# El header de 2 bytes permite leer valores de otro formato mientras se cambia la configuración.
+Codec = Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+def _msgpack_default(obj):
+    # fechas en ISO igual que orjson
+    return obj.isoformat() if hasattr(obj, "isoformat") else str(obj)
+
+# Codecs: reciben y devuelven el JSON ya serializado (así el L1 y las respuestas no cambian)
+_CODECS: Dict[bytes, Codec] = {
+    b"j": (lambda payload: payload, lambda body: body),
+}
+if msgpack is not None:
+    _CODECS[b"m"] = (
+        lambda payload: msgpack.packb(orjson.loads(payload), default=_msgpack_default),
+        lambda body: orjson.dumps(msgpack.unpackb(body)),
+    )
+
+# Compresores
+_COMPRESSORS: Dict[bytes, Codec] = {
+    b"n": (lambda body: body, lambda body: body),
+    b"z": (lambda body: zlib.compress(body, CACHE_COMPRESSION_LEVEL), zlib.decompress),
+}
+if zstandard is not None:
+    _COMPRESSORS[b"s"] = (
+        lambda body: zstandard.ZstdCompressor(level=CACHE_COMPRESSION_LEVEL).compress(body),
+        lambda body: zstandard.ZstdDecompressor().decompress(body),
+    )
+
+_CODEC_IDS = {"json": b"j", "msgpack": b"m"}
+_COMPRESSION_IDS = {"none": b"n", "zlib": b"z", "zstd": b"s"}
+
+# Valida la configuración, si falta la librería se usa el formato por defecto
+def _resolve(name: str, ids: Dict[str, bytes], available: Dict[bytes, Codec], default: bytes) -> bytes:
+    key = ids.get(name.lower())
+    if key is None or key not in available:
+        print(f"Formato de caché {name} no disponible, se usa el de por defecto")
+        return default
+    return key
+
+_codec_id = _resolve(CACHE_CODEC, _CODEC_IDS, _CODECS, b"j")
+_compression_id = _resolve(CACHE_COMPRESSION, _COMPRESSION_IDS, _COMPRESSORS, b"n")
+
+# Codifica el JSON de una entrada con el codec y la compresión configurados
+def encode_entry(soft_expires: float, payload: bytes, codec: Optional[bytes] = None, compression: Optional[bytes] = None) -> bytes:
+    codec = codec or _codec_id
+    compression = compression or _compression_id
+    body = _CODECS[codec][0](payload)
+    if compression != b"n" and len(body) >= CACHE_COMPRESSION_THRESHOLD:
+        body = _COMPRESSORS[compression][0](body)
+    else:
+        compression = b"n"
+    return codec + compression + b"%.3f|" % soft_expires + body
+
+# Decodifica una entrada y devuelve (soft_expires, JSON); None si el formato no se reconoce
+def decode_entry(raw: Optional[bytes]) -> Optional[Tuple[float, bytes]]:
+    if not raw:
+        return None
+    if raw[:1].isdigit():
+        # formato anterior sin header: b"<soft_expires>|<json>"
+        codec, compression, rest = b"j", b"n", raw
+    else:
+        codec, compression, rest = raw[:1], raw[1:2], raw[2:]
+    head, sep, body = rest.partition(b"|")
+    if not sep or codec not in _CODECS or compression not in _COMPRESSORS:
+        return None
+    try:
+        soft_expires = float(head)
+        return soft_expires, _CODECS[codec][1](_COMPRESSORS[compression][1](body))
+    except Exception as e:
+        # valores corruptos o de otro formato se tratan como miss
+        print(f"Error decoding cache entry: {e}")
+        return None
+
+# Serializa con orjson (las fechas quedan en ISO igual que en Pydantic)
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
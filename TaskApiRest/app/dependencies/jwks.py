@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from jose import jwt, JWTError
+from app.core.config import settings
+from app.core.http_client import get_hydra_client
+
+# Llaves públicas de Hydra (kid -> jwk)
+_jwks: Dict[str, dict] = {}
+_last_fetch: float = 0.0
+_refresh_lock = asyncio.Lock()
+
+# URL del JWKS de Hydra
+def get_jwks_url() -> str:
+    return settings.JWKS_URL or f"{settings.HYDRA_PUBLIC_URL}/.well-known/jwks.json"
+
+# Algoritmos permitidos para la firma
+def _allowed_algorithms() -> List[str]:
+    return [alg.strip() for alg in settings.JWT_ALGORITHMS.split(",") if alg.strip()]
+
+# Reemplaza las llaves en memoria
+def load_jwks(jwks: dict):
+    global _jwks, _last_fetch
+    _jwks = {key["kid"]: key for key in jwks.get("keys", []) if key.get("kid")}
+    _last_fetch = time.monotonic()
+
+# Descarga el JWKS, si falla se conservan las llaves anteriores
+async def refresh_jwks(force: bool = False) -> bool:
+    async with _refresh_lock:
+        # evitar descargas repetidas cuando llegan varios kid desconocidos
+        if not force and time.monotonic() - _last_fetch < settings.JWKS_MIN_REFRESH_INTERVAL:
+            return False
+        try:
+            response = await get_hydra_client().get(get_jwks_url())
+            response.raise_for_status()
+            load_jwks(response.json())
+            return True
+        except Exception as e:
+            print(f"Error al obtener el JWKS {e}")
+            return False
+
+# Busca la llave por kid, si no existe refresca el JWKS (rotación de llaves)
+async def _get_signing_key(kid: Optional[str]) -> Optional[dict]:
+    if kid in _jwks:
+        return _jwks[kid]
+    await refresh_jwks()
+    return _jwks.get(kid)
+
+# Scopes del token, Hydra usa "scp" (lista) y otros emisores "scope" (texto)
+def token_scopes(claims: dict) -> List[str]:
+    scopes = claims.get("scp")
+    if isinstance(scopes, list):
+        return [str(s) for s in scopes]
+    return (claims.get("scope") or "").split()
+
+# Verifica firma, expiración, emisor y audiencia de forma local
+async def verify_jwt(token: str) -> Optional[dict]:
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError:
+        return None
+
+    algorithms = _allowed_algorithms()
+    if header.get("alg") not in algorithms:
+        return None
+
+    key = await _get_signing_key(header.get("kid"))
+    if key is None:
+        return None
+
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=settings.JWT_AUDIENCE,
+            issuer=settings.JWT_ISSUER,
+            options={"verify_aud": settings.JWT_AUDIENCE is not None},
+        )
+    except JWTError:
+        # firma inválida, token expirado o claims incorrectos
+        return None
+
+# Refresca el JWKS periódicamente (se lanza en el lifespan)
+async def jwks_refresh_loop():
+    while True:
+        await refresh_jwks(force=True)
+        await asyncio.sleep(settings.JWKS_REFRESH_INTERVAL)
@@ -0,0 +1,140 @@
+from redis.asyncio import Redis
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
+from app.core.config import settings
+from app.core import metrics
+
+# Índice de títulos de tareas en Redis: título normalizado -> id y id -> título normalizado.
+# El campo de "listo" vive en el mismo hash, así que si Redis lo expulsa el índice se
+# considera frío y se usa la consulta al soap en lugar de dar un falso "no existe".
+# Las claves expiran después de TITLE_INDEX_MAX_AGE y se vuelven a llenar en la siguiente validación,
+# así las tareas creadas directamente en el soap (sin pasar por este gateway) entran en un tiempo acotado.
+TITLE_INDEX_KEY = "tasks:title_index"
+TITLE_INDEX_IDS_KEY = "tasks:title_index:ids"
+# (un título no puede empezar con \x00, así que no choca con el campo de listo)
+_READY_FIELD = "\x00ready"
+
+# Normaliza el título igual que la validación de conflictos
+def normalize_title(title: str) -> str:
+    return (title or "").strip().lower()
+
+# Busca el id de la tarea con ese título: (listo, id)
+async def find_task_id(redis_conn: Redis, title: str) -> Tuple[bool, Optional[int]]:
+    if not settings.TITLE_INDEX_ENABLED:
+        return False, None
+    try:
+        ready, task_id = await redis_conn.hmget(TITLE_INDEX_KEY, [_READY_FIELD, normalize_title(title)])
+    except Exception as e:
+        print(f"Error reading title index: {e}")
+        return False, None
+    if not ready:
+        metrics.incr("title_index_cold")
+        return False, None
+    metrics.incr("title_index_lookups")
+    return True, int(task_id) if task_id else None
+
+# Guarda (o cambia) el título de una tarea en el índice
+async def set_task_title(redis_conn: Redis, task_id: int, title: str):
+    if not settings.TITLE_INDEX_ENABLED:
+        return
+    norm = normalize_title(title)
+    try:
+        old = await redis_conn.hget(TITLE_INDEX_IDS_KEY, task_id)
+        pipe = redis_conn.pipeline(transaction=True)
+        # quitar el título anterior si sigue apuntando a esta tarea
+        if old and old.decode("utf-8") != norm:
+            old_owner = await redis_conn.hget(TITLE_INDEX_KEY, old)
+            if old_owner and int(old_owner) == int(task_id):
+                pipe.hdel(TITLE_INDEX_KEY, old)
+        pipe.hset(TITLE_INDEX_KEY, norm, task_id)
+        pipe.hset(TITLE_INDEX_IDS_KEY, task_id, norm)
+        await pipe.execute()
+    except Exception as e:
+        # si falla, el índice se corrige al validar el conflicto o al reconstruirse
+        print(f"Error updating title index: {e}")
+
+# Quita una tarea del índice
+async def remove_task(redis_conn: Redis, task_id: int):
+    if not settings.TITLE_INDEX_ENABLED:
+        return
+    try:
+        old = await redis_conn.hget(TITLE_INDEX_IDS_KEY, task_id)
+        pipe = redis_conn.pipeline(transaction=True)
+        if old:
+            old_owner = await redis_conn.hget(TITLE_INDEX_KEY, old)
+            if old_owner and int(old_owner) == int(task_id):
+                pipe.hdel(TITLE_INDEX_KEY, old)
+        pipe.hdel(TITLE_INDEX_IDS_KEY, task_id)
+        await pipe.execute()
+    except Exception as e:
+        print(f"Error updating title index: {e}")
+
+# Quita una entrada que ya no coincide con el soap
+async def drop_title(redis_conn: Redis, title: str):
+    try:
+        await redis_conn.hdel(TITLE_INDEX_KEY, normalize_title(title))
+    except Exception as e:
+        print(f"Error updating title index: {e}")
+
+# Llena el índice con todas las tareas del soap y lo marca como listo
+# (si se pasa el lock se renueva en cada lote para que no expire a la mitad)
+async def rebuild(redis_conn: Redis, tasks: AsyncIterator[dict], batch_size: int = 500, lock=None):
+    count = 0
+    pipe = redis_conn.pipeline(transaction=False)
+    async for task in tasks:
+        norm = normalize_title(task["title"])
+        # si hay títulos repetidos en la base se queda el primero
+        pipe.hsetnx(TITLE_INDEX_KEY, norm, task["id"])
+        pipe.hset(TITLE_INDEX_IDS_KEY, task["id"], norm)
+        count += 1
+        if count % batch_size == 0:
+            await pipe.execute()
+            if lock is not None:
+                await lock.reacquire()
+    await pipe.execute()
+    pipe = redis_conn.pipeline(transaction=True)
+    pipe.hset(TITLE_INDEX_KEY, _READY_FIELD, 1)
+    pipe.expire(TITLE_INDEX_KEY, settings.TITLE_INDEX_MAX_AGE)
+    pipe.expire(TITLE_INDEX_IDS_KEY, settings.TITLE_INDEX_MAX_AGE)
+    await pipe.execute()
+    print(f"Índice de títulos listo con {count} tareas")
+
+# Reconstruye el índice si está frío (un solo worker a la vez)
+async def rebuild_if_needed(redis_conn: Redis, tasks_factory):
+    if not settings.TITLE_INDEX_ENABLED:
+        return
+    try:
+        if await redis_conn.hexists(TITLE_INDEX_KEY, _READY_FIELD):
+            return
+        lock = redis_conn.lock(f"lock:{TITLE_INDEX_KEY}:rebuild", timeout=settings.TITLE_INDEX_REBUILD_LOCK_TTL, blocking=False)
+        if not await lock.acquire():
+            return
+        try:
+            await rebuild(redis_conn, tasks_factory(), lock=lock)
+        finally:
+            try:
+                await lock.release()
+            except Exception as e:
+                print(f"Error releasing title index lock {e}")
+    except Exception as e:
+        # el índice sigue frío y se usa la consulta al soap
+        print(f"Error rebuilding title index: {e}")
+
+# Reconstrucción en segundo plano de este worker (una a la vez)
+_rebuild_task: Optional[asyncio.Task] = None
+
+# Lanza la reconstrucción cuando una validación encuentra el índice frío
+def schedule_rebuild(redis_conn: Redis, tasks_factory):
+    global _rebuild_task
+    if not settings.TITLE_INDEX_ENABLED:
+        return
+    if _rebuild_task is not None and not _rebuild_task.done():
+        return
+    _rebuild_task = asyncio.create_task(rebuild_if_needed(redis_conn, tasks_factory))
+
+# Cancela la reconstrucción pendiente (shutdown)
+def cancel_rebuild():
+    global _rebuild_task
+    if _rebuild_task is not None:
+        _rebuild_task.cancel()
+    _rebuild_task = None
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import settings
+from app.core import metrics
+from app.dependencies.cache import get_redis_connection
+
+# Prefijo de las claves de introspección en Redis
+TOKEN_CACHE_PREFIX = "introspect:"
+
+# Caché en memoria del proceso (hash del token -> entrada)
+_local_tokens: "OrderedDict[str, dict]" = OrderedDict()
+_local_lock = threading.Lock()
+
+# Nunca se guarda el token en claro, solo su hash
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+# Calcula hasta cuándo es válida la entrada, sin pasar del exp del token
+def _entry_expiry(introspection_data: dict, now: float) -> float:
+    if not introspection_data.get("active", False):
+        return now + settings.INTROSPECTION_NEGATIVE_TTL
+    expires_at = now + settings.INTROSPECTION_CACHE_TTL
+    token_exp = introspection_data.get("exp")
+    if token_exp:
+        try:
+            expires_at = min(expires_at, float(token_exp))
+        except (TypeError, ValueError):
+            pass
+    return expires_at
+
+def _get_local(key: str, now: float) -> Optional[dict]:
+    with _local_lock:
+        entry = _local_tokens.get(key)
+        if entry is None:
+            return None
+        # si ya expiró se elimina
+        if entry["expires_at"] <= now:
+            del _local_tokens[key]
+            return None
+        _local_tokens.move_to_end(key)
+        return entry
+
+def _set_local(key: str, entry: dict):
+    with _local_lock:
+        _local_tokens[key] = entry
+        _local_tokens.move_to_end(key)
+        # expulsar las entradas más viejas si se pasa del límite
+        while len(_local_tokens) > settings.INTROSPECTION_CACHE_MAX_ENTRIES:
+            _local_tokens.popitem(last=False)
+
+# Busca la introspección en memoria y después en Redis
+async def get_cached_introspection(token: str) -> Optional[dict]:
+    key = _token_key(token)
+    now = time.time()
+
+    entry = _get_local(key, now)
+    if entry is not None:
+        metrics.incr("introspection_cache_hits")
+        metrics.incr("introspection_cache_local_hits")
+        return entry
+
+    try:
+        redis_conn = await get_redis_connection()
+        cached_data = await redis_conn.get(TOKEN_CACHE_PREFIX + key)
+        if cached_data:
+            entry = json.loads(cached_data)
+            if entry.get("expires_at", 0) > now:
+                # subir la entrada al caché local
+                _set_local(key, entry)
+                metrics.incr("introspection_cache_hits")
+                metrics.incr("introspection_cache_redis_hits")
+                return entry
+    except Exception as e:
+        print(f"Error getting introspection cache: {e}")
+
+    metrics.incr("introspection_cache_misses")
+    return None
+
+# Guarda el resultado de la introspección en ambos niveles
+async def store_introspection(token: str, introspection_data: dict) -> dict:
+    now = time.time()
+    entry = {
+        "active": bool(introspection_data.get("active", False)),
+        "scopes": (introspection_data.get("scope") or "").split(),
+        "expires_at": _entry_expiry(introspection_data, now),
+    }
+    ttl = int(entry["expires_at"] - now)
+    # si el token ya expiró no se guarda
+    if ttl <= 0:
+        return entry
+
+    key = _token_key(token)
+    _set_local(key, entry)
+    try:
+        redis_conn = await get_redis_connection()
+        await redis_conn.setex(TOKEN_CACHE_PREFIX + key, ttl, json.dumps(entry))
+    except Exception as e:
+        print(f"Error setting introspection cache: {e}")
+    return entry
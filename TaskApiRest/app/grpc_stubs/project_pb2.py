@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rproject.proto\x12\x07project\x1a\x1bgoogle/protobuf/empty.proto\"W\n\x07Project\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07summary\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"H\n\x14\x43reateProjectRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07summary\x18\x02 \x01(\t\x12\x10\n\x08priority\x18\x03 \x01(\x05\"d\n\x14UpdateProjectRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07summary\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"#\n\x15GetProjectByIdRequest\x12\n\n\x02id\x18\x01 \x01(\t\"\x81\x01\n\x13ListProjectsRequest\x12:\n\x07\x66ilters\x18\x01 \x03(\x0b\x32).project.ListProjectsRequest.FiltersEntry\x1a.\n\x0c\x46iltersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"Y\n\x19\x42ulkCreateProjectResponse\x12\x18\n\x10projects_created\x18\x01 \x01(\x05\x12\"\n\x08projects\x18\x02 \x03(\x0b\x32\x10.project.Project2\xbe\x03\n\x0eProjectService\x12@\n\rCreateProject\x12\x1d.project.CreateProjectRequest\x1a\x10.project.Project\x12@\n\rUpdateProject\x12\x1d.project.UpdateProjectRequest\x1a\x10.project.Project\x12G\n\rDeleteProject\x12\x1e.project.GetProjectByIdRequest\x1a\x16.google.protobuf.Empty\x12\x42\n\x0eGetProjectById\x12\x1e.project.GetProjectByIdRequest\x1a\x10.project.Project\x12@\n\x0cListProjects\x12\x1c.project.ListProjectsRequest\x1a\x10.project.Project0\x01\x12Y\n\x12\x42ulkCreateProjects\x12\x1d.project.CreateProjectRequest\x1a\".project.BulkCreateProjectResponse(\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rproject.proto\x12\x07project\x1a\x1bgoogle/protobuf/empty.proto\"W\n\x07Project\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07summary\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"H\n\x14\x43reateProjectRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07summary\x18\x02 \x01(\t\x12\x10\n\x08priority\x18\x03 \x01(\x05\"d\n\x14UpdateProjectRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07summary\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"#\n\x15GetProjectByIdRequest\x12\n\n\x02id\x18\x01 \x01(\t\"\xa0\x01\n\x13ListProjectsRequest\x12:\n\x07\x66ilters\x18\x01 \x03(\x0b\x32).project.ListProjectsRequest.FiltersEntry\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t\x1a.\n\x0c\x46iltersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"b\n\x18ListProjectsPageResponse\x12\"\n\x08projects\x18\x01 \x03(\x0b\x32\x10.project.Project\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x13\n\x0bnext_cursor\x18\x03 \x01(\t\"&\n\x17GetProjectsByIdsRequest\x12\x0b\n\x03ids\x18\x01 \x03(\t\">\n\x18GetProjectsByIdsResponse\x12\"\n\x08projects\x18\x01 \x03(\x0b\x32\x10.project.Project\"+\n\x19\x46indExistingTitlesRequest\x12\x0e\n\x06titles\x18\x01 \x03(\t\",\n\x1a\x46indExistingTitlesResponse\x12\x0e\n\x06titles\x18\x01 \x03(\t\"Y\n\x19\x42ulkCreateProjectResponse\x12\x18\n\x10projects_created\x18\x01 \x01(\x05\x12\"\n\x08projects\x18\x02 \x03(\x0b\x32\x10.project.Project2\xcb\x05\n\x0eProjectService\x12@\n\rCreateProject\x12\x1d.project.CreateProjectRequest\x1a\x10.project.Project\x12@\n\rUpdateProject\x12\x1d.project.UpdateProjectRequest\x1a\x10.project.Project\x12G\n\rDeleteProject\x12\x1e.project.GetProjectByIdRequest\x1a\x16.google.protobuf.Empty\x12\x42\n\x0eGetProjectById\x12\x1e.project.GetProjectByIdRequest\x1a\x10.project.Project\x12@\n\x0cListProjects\x12\x1c.project.ListProjectsRequest\x1a\x10.project.Project0\x01\x12S\n\x10ListProjectsPage\x12\x1c.project.ListProjectsRequest\x1a!.project.ListProjectsPageResponse\x12Y\n\x12\x42ulkCreateProjects\x12\x1d.project.CreateProjectRequest\x1a\".project.BulkCreateProjectResponse(\x01\x12W\n\x10GetProjectsByIds\x12 .project.GetProjectsByIdsRequest\x1a!.project.GetProjectsByIdsResponse\x12]\n\x12\x46indExistingTitles\x12\".project.FindExistingTitlesRequest\x1a#.project.FindExistingTitlesResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,11 +43,21 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GETPROJECTBYIDREQUEST']._serialized_start=320
   _globals['_GETPROJECTBYIDREQUEST']._serialized_end=355
   _globals['_LISTPROJECTSREQUEST']._serialized_start=358
-  _globals['_LISTPROJECTSREQUEST']._serialized_end=487
-  _globals['_LISTPROJECTSREQUEST_FILTERSENTRY']._serialized_start=441
-  _globals['_LISTPROJECTSREQUEST_FILTERSENTRY']._serialized_end=487
-  _globals['_BULKCREATEPROJECTRESPONSE']._serialized_start=489
-  _globals['_BULKCREATEPROJECTRESPONSE']._serialized_end=578
-  _globals['_PROJECTSERVICE']._serialized_start=581
-  _globals['_PROJECTSERVICE']._serialized_end=1027
+  _globals['_LISTPROJECTSREQUEST']._serialized_end=518
+  _globals['_LISTPROJECTSREQUEST_FILTERSENTRY']._serialized_start=472
+  _globals['_LISTPROJECTSREQUEST_FILTERSENTRY']._serialized_end=518
+  _globals['_LISTPROJECTSPAGERESPONSE']._serialized_start=520
+  _globals['_LISTPROJECTSPAGERESPONSE']._serialized_end=618
+  _globals['_GETPROJECTSBYIDSREQUEST']._serialized_start=620
+  _globals['_GETPROJECTSBYIDSREQUEST']._serialized_end=658
+  _globals['_GETPROJECTSBYIDSRESPONSE']._serialized_start=660
+  _globals['_GETPROJECTSBYIDSRESPONSE']._serialized_end=722
+  _globals['_FINDEXISTINGTITLESREQUEST']._serialized_start=724
+  _globals['_FINDEXISTINGTITLESREQUEST']._serialized_end=767
+  _globals['_FINDEXISTINGTITLESRESPONSE']._serialized_start=769
+  _globals['_FINDEXISTINGTITLESRESPONSE']._serialized_end=813
+  _globals['_BULKCREATEPROJECTRESPONSE']._serialized_start=815
+  _globals['_BULKCREATEPROJECTRESPONSE']._serialized_end=904
+  _globals['_PROJECTSERVICE']._serialized_start=907
+  _globals['_PROJECTSERVICE']._serialized_end=1622
 # @@protoc_insertion_point(module_scope)
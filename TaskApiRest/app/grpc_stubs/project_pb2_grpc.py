@@ -60,11 +60,26 @@ class ProjectServiceStub(object):
                 request_serializer=project__pb2.ListProjectsRequest.SerializeToString,
                 response_deserializer=project__pb2.Project.FromString,
                 _registered_method=True)
+        self.ListProjectsPage = channel.unary_unary(
+                '/project.ProjectService/ListProjectsPage',
+                request_serializer=project__pb2.ListProjectsRequest.SerializeToString,
+                response_deserializer=project__pb2.ListProjectsPageResponse.FromString,
+                _registered_method=True)
         self.BulkCreateProjects = channel.stream_unary(
                 '/project.ProjectService/BulkCreateProjects',
                 request_serializer=project__pb2.CreateProjectRequest.SerializeToString,
                 response_deserializer=project__pb2.BulkCreateProjectResponse.FromString,
                 _registered_method=True)
+        self.GetProjectsByIds = channel.unary_unary(
+                '/project.ProjectService/GetProjectsByIds',
+                request_serializer=project__pb2.GetProjectsByIdsRequest.SerializeToString,
+                response_deserializer=project__pb2.GetProjectsByIdsResponse.FromString,
+                _registered_method=True)
+        self.FindExistingTitles = channel.unary_unary(
+                '/project.ProjectService/FindExistingTitles',
+                request_serializer=project__pb2.FindExistingTitlesRequest.SerializeToString,
+                response_deserializer=project__pb2.FindExistingTitlesResponse.FromString,
+                _registered_method=True)
 
 
 class ProjectServiceServicer(object):
@@ -100,12 +115,30 @@ class ProjectServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListProjectsPage(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def BulkCreateProjects(self, request_iterator, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetProjectsByIds(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FindExistingTitles(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ProjectServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -134,11 +167,26 @@ def add_ProjectServiceServicer_to_server(servicer, server):
                     request_deserializer=project__pb2.ListProjectsRequest.FromString,
                     response_serializer=project__pb2.Project.SerializeToString,
             ),
+            'ListProjectsPage': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListProjectsPage,
+                    request_deserializer=project__pb2.ListProjectsRequest.FromString,
+                    response_serializer=project__pb2.ListProjectsPageResponse.SerializeToString,
+            ),
             'BulkCreateProjects': grpc.stream_unary_rpc_method_handler(
                     servicer.BulkCreateProjects,
                     request_deserializer=project__pb2.CreateProjectRequest.FromString,
                     response_serializer=project__pb2.BulkCreateProjectResponse.SerializeToString,
             ),
+            'GetProjectsByIds': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetProjectsByIds,
+                    request_deserializer=project__pb2.GetProjectsByIdsRequest.FromString,
+                    response_serializer=project__pb2.GetProjectsByIdsResponse.SerializeToString,
+            ),
+            'FindExistingTitles': grpc.unary_unary_rpc_method_handler(
+                    servicer.FindExistingTitles,
+                    request_deserializer=project__pb2.FindExistingTitlesRequest.FromString,
+                    response_serializer=project__pb2.FindExistingTitlesResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'project.ProjectService', rpc_method_handlers)
@@ -285,6 +333,33 @@ class ProjectService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ListProjectsPage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/project.ProjectService/ListProjectsPage',
+            project__pb2.ListProjectsRequest.SerializeToString,
+            project__pb2.ListProjectsPageResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def BulkCreateProjects(request_iterator,
             target,
@@ -311,3 +386,57 @@ class ProjectService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetProjectsByIds(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/project.ProjectService/GetProjectsByIds',
+            project__pb2.GetProjectsByIdsRequest.SerializeToString,
+            project__pb2.GetProjectsByIdsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FindExistingTitles(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/project.ProjectService/FindExistingTitles',
+            project__pb2.FindExistingTitlesRequest.SerializeToString,
+            project__pb2.FindExistingTitlesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
-from redis import Redis
-from typing import Optional, List, Any, Dict
-from app.schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate
+from fastapi.responses import StreamingResponse
+from redis.asyncio import Redis
+from typing import Optional, List, Any, Dict, Union
+from app.schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate, PaginatedProjectResponse, BulkImportReport, ProjectBatchResponse
+from app.core.config import settings
 from app.services import grpc_client
-from app.dependencies.cache import get_redis_connection, get_cache, set_cache, invalidate_project_cache
+from app.dependencies.cache import get_redis_connection, get_or_compute, get_or_compute_raw, get_or_compute_many, backfill_entries, read_namespace_version, is_known_missing, mark_missing, clear_missing, invalidate_project_cache, build_list_key, PROJECTS_LIST_NAMESPACE
 from app.dependencies.authentication import get_auth_dependency
+from app.dependencies.bloom_filter import projects_filter
 import grpc
+import asyncio
+import json
+import re
 import traceback
+import uuid
 import urllib.parse
 from pydantic import ValidationError
 
@@ -43,13 +50,13 @@ def _handle_grpc_error(error, detail_message: str):
     )
 
 # Función para verificar que no exista el título
-def ensure_title_not_conflicting(title: str, current_id: Optional[str] = None):
+async def ensure_title_not_conflicting(title: str, current_id: Optional[str] = None):
     if not title or title.strip() == "":
         return
     
     # Buscar proyectos con el mismo título
     try:
-        existing_projects = grpc_client.listProjectsGrpc({"title": title})
+        existing_projects = await grpc_client.listProjectsGrpc({"title": title})
         
         # Verificar si alguno coincide
         for project in existing_projects:
@@ -67,6 +74,33 @@ def ensure_title_not_conflicting(title: str, current_id: Optional[str] = None):
     except Exception as e:
         print(f"Error: {e}")
 
+# Función para verificar varios títulos en una sola llamada
+async def ensure_titles_not_conflicting(titles: List[str]):
+    existing = await grpc_client.findExistingTitlesGrpc(titles)
+    if existing is None:
+        # si el servicio no soporta la verificación, el bulk de GRPC valida duplicados
+        print("FindExistingTitles no disponible en el servicio gRPC")
+        return
+
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existen proyectos con los títulos: {', '.join(existing)}"
+        )
+
+# Formato de los ids de MongoDB (ObjectId en hexadecimal)
+OBJECT_ID_PATTERN = re.compile(r"^[0-9a-fA-F]{24}$")
+
+# Los proyectos nuevos se quitan del caché negativo y se agregan al filtro de Bloom
+async def _register_created_projects(redis: Redis, project_ids: List[str]):
+    await clear_missing(redis, *[f"project:{project_id}" for project_id in project_ids])
+    await projects_filter.add(redis, *project_ids)
+
+# Recorre todos los ids de GRPC (para reconstruir el filtro de Bloom)
+async def iter_project_ids():
+    async for p in grpc_client.streamProjectsGrpc({}):
+        yield p.id
+
 # Función para normalizar el id del proyecto
 def _normalize_project_id(project_id: str) -> str:
     # sirve para limpiar espacios y caracteres extraños
@@ -81,9 +115,64 @@ def _normalize_project_id(project_id: str) -> str:
     
     return project_id
 
+# Convierte un proyecto de GRPC al dict que se guarda en caché (ya validado como ProjectResponse)
+def _project_dict(p) -> dict:
+    return ProjectResponse(
+        id=p.id,
+        title=p.title,
+        summary=p.summary,
+        priority=p.priority,
+        status=(p.status or "PENDING")
+    ).model_dump()
+
+# Clave de caché de los filtros, el título se compara sin mayúsculas en GRPC
+def _filters_key(filters: Dict[str, str]) -> str:
+    normalized = {k: (v.lower() if k == "title" else v) for k, v in filters.items()}
+    return urllib.parse.urlencode(sorted(normalized.items()))
+
+# Guarda cada proyecto de una lista como project:{id} en un solo pipeline,
+# solo si la versión leída antes de llamar a GRPC no cambió
+async def _backfill_projects(projects: List[dict], redis: Redis, version: Optional[int]):
+    await backfill_entries({f"project:{project['id']}": project for project in projects}, redis, PROJECTS_LIST_NAMESPACE, version)
+
+# Endpoint para get por varios ids (va antes de /{project_id})
+@router.get("/batch", response_model=ProjectBatchResponse)
+async def getProjectsByIds(
+    # ids separados por coma o repetidos (?ids=a,b&ids=c)
+    ids: List[str] = Query(..., description="Ids de los proyectos"),
+    redis: Redis = Depends(get_redis_connection),
+    _auth: bool = auth_read
+):
+    # Normalizar y quitar ids repetidos conservando el orden
+    project_ids: List[str] = []
+    for raw in ",".join(ids).split(","):
+        project_id = _normalize_project_id(raw)
+        if project_id and project_id not in project_ids:
+            project_ids.append(project_id)
+    if not project_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids requerido")
+    if len(project_ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.BATCH_MAX_IDS} ids por petición"
+        )
+
+    # Consulta al servicio GRPC solo los proyectos que no están en caché, en una sola llamada
+    async def _load_missing(keys: List[str]):
+        res = await grpc_client.getProjectsByIdsGrpc([key.split(":", 1)[1] for key in keys])
+        return {f"project:{p.id}": _project_dict(p) for p in res}
+
+    found = await get_or_compute_many([f"project:{project_id}" for project_id in project_ids], _load_missing, redis)
+
+    # Devolver en el orden pedido
+    return ProjectBatchResponse(
+        projects=[ProjectResponse.model_validate(found[f"project:{pid}"]) for pid in project_ids if f"project:{pid}" in found],
+        missing=[pid for pid in project_ids if f"project:{pid}" not in found]
+    )
+
 # Endpoint para getById
 @router.get("/{project_id}", response_model=ProjectResponse)
-def getProjectById(
+async def getProjectById(
     project_id: str,
     request: Request = None,
     redis: Redis = Depends(get_redis_connection), 
@@ -92,28 +181,33 @@ def getProjectById(
     try:
         # Normaliza el id
         project_id = _normalize_project_id(project_id)
+        # un id que no es ObjectId no puede existir, no se manda a GRPC
+        if not OBJECT_ID_PATTERN.match(project_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="id formato inválido")
         cache_key = f"project:{project_id}"
 
-        # Intentar obtener de caché
-        cached = get_cache(cache_key, redis)
-        if cached:
-            return ProjectResponse.model_validate(cached)
+        # ids que no existen (caché negativo o filtro de Bloom) no llegan a GRPC
+        if await is_known_missing(cache_key, redis) or not await projects_filter.might_contain(redis, project_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Proyecto con id {project_id} no encontrado")
 
-        # Llamar al servicio GRPC
-        res = grpc_client.getProjectByIdGrpc(project_id)
-        
-        # Construir la respuesta
-        res_dict = {
-            "id": res.id,
-            "title": res.title,
-            "summary": res.summary,
-            "priority": res.priority,
-            "status": res.status or "PENDING"
-        }
+        # Consulta al servicio GRPC, solo una petición la recalcula cuando expira
+        async def _load_project():
+            # Llamar al servicio GRPC
+            res = await grpc_client.getProjectByIdGrpc(project_id)
+            
+            # Construir la respuesta
+            return _project_dict(res)
 
-        # Guardar en caché
-        set_cache(cache_key, res_dict, redis)
-        return ProjectResponse.model_validate(res_dict)
+        # Obtener de caché o del servicio GRPC
+        try:
+            payload = await get_or_compute_raw(cache_key, _load_project, redis)
+        except HTTPException as he:
+            # recordar por poco tiempo que no existe
+            if he.status_code == status.HTTP_404_NOT_FOUND:
+                await mark_missing(redis, cache_key)
+            raise
+        # Devolver el JSON guardado sin volver a validarlo
+        return Response(content=payload, media_type="application/json")
     
     # manejo de errores
     except grpc.RpcError as e:
@@ -127,14 +221,45 @@ def getProjectById(
             detail=f"Error interno del servidor: {str(e)}"
         )
 
+# Media type para respuestas en streaming (un JSON por línea)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Escribe cada proyecto del stream GRPC como una línea de JSON
+# Si el stream GRPC falla a la mitad el error se propaga y se aborta la respuesta,
+# así el cliente no recibe un NDJSON cortado que parece completo
+async def _ndjson_projects(first, grpc_stream):
+    try:
+        if first is None:
+            return
+        yield _project_line(first)
+        async for p in grpc_stream:
+            yield _project_line(p)
+    finally:
+        # cierra el stream GRPC (también si el cliente se desconecta)
+        await grpc_stream.aclose()
+
+def _project_line(p) -> bytes:
+    project = ProjectResponse(
+        id=p.id,
+        title=p.title,
+        summary=p.summary,
+        priority=p.priority,
+        status=(p.status or "PENDING")
+    )
+    return project.model_dump_json().encode("utf-8") + b"\n"
+
 # Endpoint para GetAll con filtros
-@router.get("/", response_model=List[ProjectResponse])
-def getProjects(
+@router.get("/", response_model=Union[List[ProjectResponse], PaginatedProjectResponse])
+async def getProjects(
     # Filtros opcionales
     title: Optional[str] = Query(None, description="Filtrar por título exacto"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filtrar por status"),
     priority: Optional[int] = Query(None, ge=1, le=5, description="Filtrar por prioridad"),
+    stream: bool = Query(False, description="Devolver los proyectos como NDJSON conforme llegan"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
     request: Request = None,
+    redis: Redis = Depends(get_redis_connection),
     _auth: bool = auth_read
 ):
     try:
@@ -147,19 +272,52 @@ def getProjects(
         if priority is not None:
             parsed_filters["priority"] = str(priority)
 
-        # Llamar al servicio GRPC
-        grpc_items = grpc_client.listProjectsGrpc(parsed_filters)
+        # Streaming si lo piden con el query o con el header Accept
+        accept = request.headers.get("accept", "") if request else ""
+        if stream or NDJSON_MEDIA_TYPE in accept:
+            grpc_stream = grpc_client.streamProjectsGrpc(parsed_filters, limit or 0, cursor)
+            # se lee el primer proyecto antes de responder para devolver errores con su status
+            try:
+                first = await grpc_stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return StreamingResponse(_ndjson_projects(first, grpc_stream), media_type=NDJSON_MEDIA_TYPE)
+
+        # Paginación con cursor, se guarda en caché por página
+        if limit is not None or cursor:
+            page_limit = limit or 50
+            cache_key = await build_list_key(redis, PROJECTS_LIST_NAMESPACE, f"l{page_limit}:c{cursor}:f{_filters_key(parsed_filters)}")
+
+            async def _load_page():
+                version = await read_namespace_version(redis, PROJECTS_LIST_NAMESPACE)
+                res = await grpc_client.listProjectsPageGrpc(parsed_filters, page_limit, cursor)
+                projects = [_project_dict(p) for p in res.projects]
+                # llenar también el caché de cada proyecto
+                await _backfill_projects(projects, redis, version)
+                return PaginatedProjectResponse(
+                    projects=projects,
+                    total=res.total,
+                    next_cursor=res.next_cursor or None
+                ).model_dump()
+
+            page = await get_or_compute(cache_key, _load_page, redis)
+            return PaginatedProjectResponse.model_validate(page)
+
+        # Lista completa, se guarda en caché por filtros
+        cache_key = await build_list_key(redis, PROJECTS_LIST_NAMESPACE, f"all:f{_filters_key(parsed_filters)}")
+
+        async def _load_all():
+            version = await read_namespace_version(redis, PROJECTS_LIST_NAMESPACE)
+            # Llamar al servicio GRPC
+            grpc_items = await grpc_client.listProjectsGrpc(parsed_filters)
+            projects = [_project_dict(p) for p in grpc_items]
+            # llenar el caché de cada proyecto para el siguiente GET /projects/{id}
+            await _backfill_projects(projects, redis, version)
+            return projects
+
+        projects = await get_or_compute(cache_key, _load_all, redis)
         # Construir la lista de respuestas
-        return [
-            ProjectResponse(
-                id=p.id,
-                title=p.title,
-                summary=p.summary,
-                priority=p.priority,
-                status=(p.status or "PENDING")
-            )
-            for p in grpc_items
-        ]
+        return [ProjectResponse.model_validate(project) for project in projects]
     
     # manejo de errores
     except grpc.RpcError as e:
@@ -175,7 +333,7 @@ def getProjects(
 
 # endpoint para createProject 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-def createProject(
+async def createProject(
     project_data: Dict[str, Any], # Recibir como dict
     request: Request = None,
     response: Response = None,
@@ -213,13 +371,14 @@ def createProject(
             )
 
         # Verificar conflicto de título
-        ensure_title_not_conflicting(project.title)
+        await ensure_title_not_conflicting(project.title)
 
         # Llamar al servicio GRPC
-        res = grpc_client.createProjectGrpc(project)
+        res = await grpc_client.createProjectGrpc(project)
         
         # Invalidar caché porque hay un nuevo proyecto
-        invalidate_project_cache(redis)
+        await invalidate_project_cache(redis)
+        await _register_created_projects(redis, [res.id])
         
         # Configurar header Location
         if response and request:
@@ -248,7 +407,7 @@ def createProject(
 
 # endpoint para updateProject
 @router.put("/{project_id}", response_model=ProjectResponse)
-def updateProject(
+async def updateProject(
     project_id: str,
     project_data: Dict[str, Any], 
     request: Request = None,
@@ -295,13 +454,13 @@ def updateProject(
             )
 
         # Verificar conflicto de título
-        ensure_title_not_conflicting(project.title, project_id)
+        await ensure_title_not_conflicting(project.title, project_id)
 
         # Llamar al servicio GRPC
-        res = grpc_client.updateProjectGrpc(project_id, project)
+        res = await grpc_client.updateProjectGrpc(project_id, project)
         
         # Invalidar caché por la actualización
-        invalidate_project_cache(redis, project_id)
+        await invalidate_project_cache(redis, project_id)
         
         # Devolver respuesta
         return ProjectResponse(
@@ -326,7 +485,7 @@ def updateProject(
 
 # endpoint para deleteProject
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deleteProject(
+async def deleteProject(
     project_id: str,
     request: Request = None,
     redis: Redis = Depends(get_redis_connection),
@@ -343,10 +502,10 @@ def deleteProject(
             )
 
         # Llamar al servicio GRPC
-        grpc_client.deleteProjectGrpc(project_id)
+        await grpc_client.deleteProjectGrpc(project_id)
         
         # Invalidar caché por la eliminación
-        invalidate_project_cache(redis, project_id)
+        await invalidate_project_cache(redis, project_id)
         
         # Devolver respuesta sin contenido
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -368,7 +527,7 @@ def deleteProject(
 
 # endpoint para bulkCreateProjects
 @router.post("/bulk", response_model=dict, status_code=status.HTTP_201_CREATED)
-def bulkCreateProjects(
+async def bulkCreateProjects(
     # Lista de proyectos a crear
     projects: List[ProjectCreate],
     redis: Redis = Depends(get_redis_connection),
@@ -390,15 +549,29 @@ def bulkCreateProjects(
                     detail=f"La prioridad del proyecto {i+1} debe ser entre 1 y 5"
                 )
 
-        # Verificar conflictos de título
+        # Verificar títulos repetidos dentro del mismo payload
+        seen = set()
+        duplicated = []
         for project in projects:
-            ensure_title_not_conflicting(project.title)
+            key = project.title.strip().lower()
+            if key in seen:
+                duplicated.append(project.title.strip())
+            seen.add(key)
+        if duplicated:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Títulos repetidos en la solicitud: {', '.join(duplicated)}"
+            )
+
+        # Verificar conflictos de título con una sola llamada
+        await ensure_titles_not_conflicting([project.title for project in projects])
 
         # Llamar al servicio GRPC
-        result = grpc_client.bulkCreateProjectsGrpc(projects)
+        result = await grpc_client.bulkCreateProjectsGrpc(projects)
         
         # Invalidar caché por los nuevos proyectos
-        invalidate_project_cache(redis)
+        await invalidate_project_cache(redis)
+        await _register_created_projects(redis, [p.id for p in result.projects])
         
         # Devolver respuesta
         return {
@@ -425,4 +598,173 @@ def bulkCreateProjects(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error interno del servidor: {str(e)}"
-        )
\ No newline at end of file
+        )
+# Lee el cuerpo NDJSON línea por línea sin cargarlo completo en memoria
+async def _ndjson_lines(request: Request):
+    buffer = b""
+    line_no = 0
+    async for data in request.stream():
+        buffer += data
+        lines = buffer.split(b"\n")
+        # la última parte puede ser una línea incompleta
+        buffer = lines.pop()
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+# Agrupa las líneas en lotes del tamaño indicado
+async def _ndjson_chunks(request: Request, chunk_size: int):
+    chunk = []
+    index = 0
+    async for line_no, line in _ndjson_lines(request):
+        chunk.append((line_no, line))
+        if len(chunk) >= chunk_size:
+            yield index, chunk
+            index += 1
+            chunk = []
+    if chunk:
+        yield index, chunk
+
+# Valida las líneas de un lote y descarta títulos repetidos en la importación
+def _parse_import_chunk(chunk, seen_titles: set):
+    items = []
+    valid = []
+    for line_no, line in chunk:
+        item = {"line": line_no, "title": None, "status": "failed", "id": None, "error": None}
+        items.append(item)
+        try:
+            project = ProjectCreate.model_validate(json.loads(line))
+        except ValueError as e:
+            item["error"] = f"Línea inválida: {e}"
+            continue
+
+        item["title"] = project.title
+        key = project.title.lower()
+        if key in seen_titles:
+            item["error"] = "Título repetido en la importación"
+            continue
+        seen_titles.add(key)
+        valid.append((item, project))
+    return items, valid
+
+# Manda un lote por BulkCreateProjects y marca cada línea con su resultado
+async def _commit_import_chunk(index: int, valid, redis: Redis, chunks_key: str) -> bool:
+    try:
+        if valid:
+            # los títulos que ya existen se reportan sin abortar el lote
+            existing = await grpc_client.findExistingTitlesGrpc([project.title for _, project in valid])
+            existing = {title.strip().lower() for title in existing}
+            pending = []
+            for item, project in valid:
+                if project.title.lower() in existing:
+                    item["error"] = "El título ya existe"
+                else:
+                    pending.append((item, project))
+
+            if pending:
+                result = await grpc_client.bulkCreateProjectsGrpc([project for _, project in pending])
+                await _register_created_projects(redis, [p.id for p in result.projects])
+                created = {p.title.strip().lower(): p.id for p in result.projects}
+                for item, project in pending:
+                    project_id = created.get(project.title.lower())
+                    if project_id:
+                        item["status"] = "created"
+                        item["id"] = project_id
+                    else:
+                        item["error"] = "El proyecto no fue creado"
+    except HTTPException as he:
+        # el lote no se confirma para poder reintentarlo al reanudar
+        print(f"Error en el lote {index} de la importación {he.detail}")
+        for item, _ in valid:
+            if item["status"] != "created":
+                item["error"] = item["error"] or he.detail
+        return False
+
+    # guardar el lote como confirmado
+    try:
+        await redis.sadd(chunks_key, index)
+        await redis.expire(chunks_key, settings.BULK_IMPORT_STATE_TTL)
+    except Exception as e:
+        print(f"Error al guardar el avance de la importación {e}")
+    return True
+
+# endpoint para importar proyectos por lotes desde NDJSON (se puede reanudar con import_id)
+@router.post("/bulk/import", response_model=BulkImportReport)
+async def importProjects(
+    request: Request,
+    import_id: Optional[str] = Query(None, description="Id de una importación anterior para reanudarla"),
+    chunk_size: Optional[int] = Query(None, ge=1, le=5000, description="Proyectos por lote"),
+    redis: Redis = Depends(get_redis_connection),
+    _auth: bool = auth_write # Dependencia de autenticación
+):
+    import_id = import_id or uuid.uuid4().hex
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+    size_key = f"bulk_import:{import_id}:chunk_size"
+    chunks_key = f"bulk_import:{import_id}:chunks"
+
+    # al reanudar se usa el tamaño de lote original para que los índices coincidan
+    committed = set()
+    try:
+        stored_size = await redis.get(size_key)
+        if stored_size:
+            chunk_size = int(stored_size)
+            committed = {int(index) for index in await redis.smembers(chunks_key)}
+        else:
+            await redis.set(size_key, chunk_size, ex=settings.BULK_IMPORT_STATE_TTL)
+    except Exception as e:
+        print(f"Error al leer el avance de la importación {e}")
+
+    semaphore = asyncio.Semaphore(max(1, settings.BULK_IMPORT_MAX_CONCURRENCY))
+    seen_titles = set()
+    chunk_items = []
+    tasks = []
+    skipped = 0
+
+    async def _run_chunk(index, valid):
+        try:
+            return await _commit_import_chunk(index, valid, redis, chunks_key)
+        finally:
+            semaphore.release()
+
+    try:
+        async for index, chunk in _ndjson_chunks(request, chunk_size):
+            # lotes confirmados en un intento anterior
+            if index in committed:
+                skipped += 1
+                chunk_items.append([
+                    {"line": line_no, "title": None, "status": "skipped", "id": None, "error": None}
+                    for line_no, _ in chunk
+                ])
+                continue
+
+            items, valid = _parse_import_chunk(chunk, seen_titles)
+            chunk_items.append(items)
+            # no se lee el siguiente lote hasta que haya lugar
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(_run_chunk(index, valid)))
+    except Exception:
+        # esperar los lotes en curso antes de propagar el error
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    results = await asyncio.gather(*tasks)
+
+    items = [item for chunk in chunk_items for item in chunk]
+    created = sum(1 for item in items if item["status"] == "created")
+    if created:
+        # Invalidar caché por los nuevos proyectos
+        await invalidate_project_cache(redis)
+
+    return BulkImportReport(
+        import_id=import_id,
+        chunk_size=chunk_size,
+        chunks_committed=sum(1 for ok in results if ok),
+        chunks_skipped=skipped,
+        chunks_failed=sum(1 for ok in results if not ok),
+        projects_created=created,
+        projects_failed=sum(1 for item in items if item["status"] == "failed"),
+        items=items
+    )
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
-from redis import Redis
+from redis.asyncio import Redis
 from typing import Optional, List
-from app.schemas.task import TaskResponse, PaginatedTaskResponse, TaskCreate, TaskUpdate, TaskPatch
+from app.schemas.task import TaskResponse, PaginatedTaskResponse, TaskCreate, TaskUpdate, TaskPatch, TaskBatchResponse
+from app.core.config import settings
 from app.services import soap_client
-from app.dependencies.cache import get_redis_connection, get_cache, set_cache, invalidate_task_cache
+from app.dependencies.cache import get_redis_connection, get_or_compute, get_or_compute_raw, get_or_compute_many, backfill_entries, read_namespace_version, is_known_missing, mark_missing, clear_missing, invalidate_task_cache, build_list_key, TASKS_LIST_NAMESPACE
 from app.dependencies.authentication import get_auth_dependency
+from app.dependencies.bloom_filter import tasks_filter
+from app.dependencies import title_index
 from zeep.helpers import serialize_object
 import traceback
+import urllib.parse
 
 # Configuración del router
 router = APIRouter(
@@ -28,13 +32,33 @@ def _normalize_existing_list(existing_res):
     return [existing_dict]
 
 # Verifica que no exista conflicto de título
-def ensure_title_not_conflicting(title: str, current_id: Optional[int] = None):
+async def ensure_title_not_conflicting(title: str, current_id: Optional[int] = None, redis: Optional[Redis] = None):
     # Normalizar entrada
     if not title:
         return
 
-    # Consulta el SOAP por title y lanza HTTPException 409 si existe otra tarea con ese título.
-    existing = soap_client.getTaskByTitleSoap(title)
+    # Primero el índice de títulos en Redis (un solo HGET)
+    if redis is not None:
+        ready, existing_id = await title_index.find_task_id(redis, title)
+        if not ready:
+            # índice frío o expirado: se llena en segundo plano y esta vez se consulta el soap
+            title_index.schedule_rebuild(redis, iter_tasks)
+        else:
+            if existing_id is None or (current_id is not None and existing_id == int(current_id)):
+                return
+            # confirmar con el soap antes de rechazar, por si el índice quedó viejo
+            try:
+                existing_task = serialize_object(await soap_client.getTaskByIdSoap(existing_id))
+            except soap_client.soapNotFound:
+                existing_task = None
+            if existing_task and title_index.normalize_title(existing_task.get("title")) == title_index.normalize_title(title):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail=f"Una tarea con el título '{title}' ya existe.")
+            # la entrada ya no es válida, se borra y se consulta el soap
+            await title_index.drop_title(redis, title)
+
+    # Consulta el SOAP por título exacto y lanza HTTPException 409 si existe otra tarea con ese título.
+    existing = await soap_client.getTaskByExactTitleSoap(title)
     existing_list = _normalize_existing_list(existing)
     # Normalizar título
     title_norm = title.strip().lower()
@@ -63,34 +87,9 @@ def ensure_title_not_conflicting(title: str, current_id: Optional[int] = None):
                 # si no podemos parsear id se considera conflicto por seguridad
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                                     detail=f"Una tarea con el título '{title}' ya existe.")
-# Endpoint para get all con paginación
-@router.get("/", response_model=PaginatedTaskResponse)
-def getAllTask(
-    # Parámetros de consulta
-    page: int = Query(1, ge=1),
-    pageSize: int = Query(10, ge=1, le=100),
-    filter: Optional[str] = Query(None),
-    sortBy: Optional[str] = Query(None),
-    sortOrder: str = Query("asc", pattern="^(asc|desc)$"),
-    redis: Redis = Depends(get_redis_connection),
-    request: Request = None,
-    _auth: bool = auth_read # necesita la autorización de read
-):
-    # Crear clave de caché para esta consulta
-    cache_key = f"tasks_list:p{page}:ps{pageSize}:f{filter}:s{sortBy}:so{sortOrder}"
-    
-    # Intentar obtener de caché
-    cached_data = get_cache(cache_key, redis)
-    if cached_data:
-        # datos de Pydantic desde el caché
-        return PaginatedTaskResponse.model_validate(cached_data)
-
-    # llamar al soap
-    response = soap_client.getAllTasksSoap(page, pageSize, filter, sortBy, sortOrder)
-    
-    # Guardar en caché
-    response_dict = serialize_object(response)
 
+# Normaliza la respuesta paginada del soap
+def _build_paginated(response_dict) -> dict:
     # hacer que tasks sea siempre una lista
     def _ensure_list(obj):
         # si ya es una lista, devolverla
@@ -125,32 +124,133 @@ def getAllTask(
         "pageSize": response_dict.get("pageSize", response_dict.get("PageSize", response_dict.get("page_size", 10))),
         "totalTasks": response_dict.get("totalTasks", response_dict.get("TotalTasks", response_dict.get("total", len(normalized_tasks)))),
         "totalPages": response_dict.get("totalPages", response_dict.get("TotalPages", 1)),
+        "nextCursor": response_dict.get("nextCursor"),
     }
 
-    # Guardar en caché la paginación
-    response_pydantic = PaginatedTaskResponse.model_validate(paginated)
-    set_cache(cache_key, response_pydantic.model_dump(), redis)
-    # Devolver la respuesta
-    return response_pydantic
+    # Validar con Pydantic y devolver un dict para el caché
+    return PaginatedTaskResponse.model_validate(paginated).model_dump()
+
+# Recorre todas las tareas del soap por páginas (para reconstruir el filtro de Bloom y el índice de títulos)
+async def iter_tasks(page_size: int = 100):
+    # con cursor y sin conteo, cada página cuesta lo mismo aunque la tabla sea grande
+    cursor = None
+    while True:
+        response = await soap_client.getAllTasksSoap(1, page_size, None, "id", "asc", cursor=cursor, includeTotal=False)
+        paginated = _build_paginated(serialize_object(response))
+        for task in paginated["tasks"]:
+            yield task
+        cursor = paginated["nextCursor"]
+        if not cursor or not paginated["tasks"]:
+            break
+
+async def iter_task_ids(page_size: int = 100):
+    async for task in iter_tasks(page_size):
+        yield task["id"]
+
+# Endpoint para get all con paginación
+@router.get("/", response_model=PaginatedTaskResponse)
+async def getAllTask(
+    # Parámetros de consulta
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(10, ge=1, le=100),
+    filter: Optional[str] = Query(None),
+    sortBy: Optional[str] = Query(None),
+    sortOrder: str = Query("asc", pattern="^(asc|desc)$"),
+    # nextCursor de la respuesta anterior, si se manda se ignora page
+    cursor: Optional[str] = Query(None),
+    # el conteo total es otra consulta en el soap, se puede omitir
+    includeTotal: bool = Query(True),
+    redis: Redis = Depends(get_redis_connection),
+    request: Request = None,
+    _auth: bool = auth_read # necesita la autorización de read
+):
+    # Crear clave de caché para esta consulta (incluye la versión de las listas)
+    position = f"c{urllib.parse.quote(cursor)}" if cursor else f"p{page}"
+    cache_key = await build_list_key(redis, TASKS_LIST_NAMESPACE, f"{position}:ps{pageSize}:f{filter}:s{sortBy}:so{sortOrder}:t{int(includeTotal)}")
+
+    # Consulta al soap, solo una petición la recalcula cuando expira
+    async def _load_page():
+        # versión antes de llamar al soap, si una escritura la cambia no se llena el caché de cada tarea
+        version = await read_namespace_version(redis, TASKS_LIST_NAMESPACE)
+        # llamar al soap
+        response = await soap_client.getAllTasksSoap(page, pageSize, filter, sortBy, sortOrder, cursor=cursor, includeTotal=includeTotal)
+        paginated = _build_paginated(serialize_object(response))
+        # llenar también el caché de cada tarea para el siguiente GET /tasks/{id}
+        await backfill_entries({f"task:{task['id']}": task for task in paginated["tasks"]}, redis, TASKS_LIST_NAMESPACE, version)
+        return paginated
+
+    # Obtener de caché o del soap, el JSON guardado ya está validado y se devuelve tal cual
+    payload = await get_or_compute_raw(cache_key, _load_page, redis)
+    return Response(content=payload, media_type="application/json")
 
 # Endpoint para get by title
 @router.get("/getByTitle", response_model=List[TaskResponse])
-def getTaskByTitle(
+async def getTaskByTitle(
     title: str = Query(..., min_length=1), # El título lo dan en un query param
+    redis: Redis = Depends(get_redis_connection),
     request: Request = None,
     _auth: bool = auth_read # necesita la autorización de read
 ):
-    # Llamar al soap
-    response_list = soap_client.getTaskByTitleSoap(title)
-    
-    # Convierte la lista de objetos Zeep a una lista de Pydantic
-    response_list_dict = serialize_object(response_list)
-    # normalizar a lista
-    return [TaskResponse.model_validate(task) for task in response_list_dict]
+    # La clave usa el título tal como llega, el soap decide cómo compararlo
+    cache_key = await build_list_key(redis, TASKS_LIST_NAMESPACE, f"title:{urllib.parse.quote(title)}")
+
+    async def _load_by_title():
+        version = await read_namespace_version(redis, TASKS_LIST_NAMESPACE)
+        # Llamar al soap
+        response_list = await soap_client.getTaskByTitleSoap(title)
+        # Convierte la lista de objetos Zeep a dicts de Pydantic
+        tasks = [TaskResponse.model_validate(task).model_dump() for task in _normalize_existing_list(response_list)]
+        # llenar también el caché de cada tarea
+        await backfill_entries({f"task:{task['id']}": task for task in tasks}, redis, TASKS_LIST_NAMESPACE, version)
+        return tasks
+
+    # Obtener de caché o del soap
+    tasks = await get_or_compute(cache_key, _load_by_title, redis)
+    return [TaskResponse.model_validate(task) for task in tasks]
+
+# Endpoint para get por varios ids (va antes de /{task_id})
+@router.get("/batch", response_model=TaskBatchResponse)
+async def getTasksByIds(
+    # ids separados por coma o repetidos (?ids=1,2&ids=3)
+    ids: List[str] = Query(..., description="Ids de las tareas"),
+    redis: Redis = Depends(get_redis_connection),
+    _auth: bool = auth_read # necesita la autorización de read
+):
+    # Validar y quitar ids repetidos conservando el orden
+    task_ids: List[int] = []
+    for raw in ",".join(ids).split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if not raw.isdigit() or int(raw) <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Id inválido: {raw}")
+        if int(raw) not in task_ids:
+            task_ids.append(int(raw))
+    if not task_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids requerido")
+    if len(task_ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.BATCH_MAX_IDS} ids por petición"
+        )
+
+    # Consulta al soap solo las tareas que no están en caché, en una sola llamada
+    async def _load_missing(keys: List[str]):
+        response_list = await soap_client.getTasksByIdsSoap([int(key.split(":", 1)[1]) for key in keys])
+        tasks = [TaskResponse.model_validate(task).model_dump() for task in _normalize_existing_list(response_list)]
+        return {f"task:{task['id']}": task for task in tasks}
+
+    found = await get_or_compute_many([f"task:{task_id}" for task_id in task_ids], _load_missing, redis)
+
+    # Devolver en el orden pedido
+    return TaskBatchResponse(
+        tasks=[TaskResponse.model_validate(found[f"task:{task_id}"]) for task_id in task_ids if f"task:{task_id}" in found],
+        missing=[task_id for task_id in task_ids if f"task:{task_id}" not in found]
+    )
 
 # Endpoint para get by id
 @router.get("/{task_id}", response_model=TaskResponse)
-def getTaskById(
+async def getTaskById(
     # El id de la tarea va en la ruta
     task_id: int,
     # conexión con Redis
@@ -161,24 +261,30 @@ def getTaskById(
     # Crea su clave para caché
     cache_key = f"task:{task_id}"
 
-    # Obtener de caché
-    cached_data = get_cache(cache_key, redis)
-    if cached_data:
-        return TaskResponse.model_validate(cached_data)
+    # ids que no existen (caché negativo o filtro de Bloom) no llegan al soap
+    if await is_known_missing(cache_key, redis) or not await tasks_filter.might_contain(redis, task_id):
+        raise soap_client.soapNotFound(detail="Tarea no encontrada.")
 
-    # Llamar al soap
-    response = soap_client.getTaskByIdSoap(task_id)
+    # Consulta al soap, solo una petición la recalcula cuando expira
+    async def _load_task():
+        response = await soap_client.getTaskByIdSoap(task_id)
+        response_dict = serialize_object(response)
+        return TaskResponse.model_validate(response_dict).model_dump()
 
-    # Guardar en caché
-    response_dict = serialize_object(response)
-    response_pydantic = TaskResponse.model_validate(response_dict)
-    set_cache(cache_key, response_pydantic.model_dump(), redis)
-    # Devolver la respuesta
-    return response_pydantic
+    # Obtener de caché o del soap
+    try:
+        payload = await get_or_compute_raw(cache_key, _load_task, redis)
+    except HTTPException as he:
+        # recordar por poco tiempo que no existe
+        if he.status_code == status.HTTP_404_NOT_FOUND:
+            await mark_missing(redis, cache_key)
+        raise
+    # Devolver el JSON guardado sin volver a validarlo
+    return Response(content=payload, media_type="application/json")
 
 # Endpoint para crear tarea
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def createTask(
+async def createTask(
     # La petición para crear la tarea
     task: TaskCreate,
     request: Request,
@@ -190,15 +296,19 @@ def createTask(
 ):
     try:
         # si existe otra tarea con el mismo título
-        ensure_title_not_conflicting(task.title)
+        await ensure_title_not_conflicting(task.title, redis=redis)
         # Llamar al SOAP para crear la tarea
-        new_task = soap_client.createTaskSoap(task)
+        new_task = await soap_client.createTaskSoap(task)
 
         # borra caché de la listas usando la función unificada
-        invalidate_task_cache(redis)
+        await invalidate_task_cache(redis)
 
         # Convertimos a dict para Pydantic
         new_task_dict = serialize_object(new_task)
+        # la nueva tarea ya existe para el caché negativo y el filtro de Bloom
+        await clear_missing(redis, f"task:{new_task_dict['id']}")
+        await tasks_filter.add(redis, new_task_dict['id'])
+        await title_index.set_task_title(redis, new_task_dict['id'], new_task_dict['title'])
         url = request.url_for("getTaskById", task_id=new_task_dict['id'])
         # Añadir header Location
         response.headers["Location"] = str(url)
@@ -218,7 +328,7 @@ def createTask(
 
 # Endpoint para put tarea 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task_put(
+async def update_task_put(
     # El id de la tarea va en la ruta
     task_id: int,
     # La petición para actualizar la tarea
@@ -230,15 +340,17 @@ def update_task_put(
     try:
         # Llamar al soap
         # si existe otra tarea con el mismo título
-        ensure_title_not_conflicting(task.title, current_id=task_id)
+        await ensure_title_not_conflicting(task.title, current_id=task_id, redis=redis)
 
-        updated_task = soap_client.updateTaskSoap(task_id, task)
+        updated_task = await soap_client.updateTaskSoap(task_id, task)
 
         # Invalidar cache usando la función unificada
-        invalidate_task_cache(redis, task_id)
+        await invalidate_task_cache(redis, task_id)
 
         # Convertimos a dict para Pydantic
         updated_task_dict = serialize_object(updated_task)
+        # actualizar el índice de títulos
+        await title_index.set_task_title(redis, task_id, updated_task_dict['title'])
         return TaskResponse.model_validate(updated_task_dict)
     
     # manejo de excepciones
@@ -254,7 +366,7 @@ def update_task_put(
 
 # Endpoint para patch tarea
 @router.patch("/{task_id}", response_model=TaskResponse)
-def updateTask(
+async def updateTask(
     # El id de la tarea va en la ruta
     task_id: int,
     # La petición para actualizar la tarea
@@ -270,19 +382,21 @@ def updateTask(
         # Si se quiere actualizar el título, comprobar conflictos
         if "title" in task_data and task_data.get("title"):
             title_val = task_data.get("title").strip()
-            ensure_title_not_conflicting(title_val, current_id=task_id)
+            await ensure_title_not_conflicting(title_val, current_id=task_id, redis=redis)
 
         # Creamos un TaskPatch object para que zeep maneje nones
         patch_obj = TaskPatch(**task_data)
 
         # llamar al soap
-        updated_task = soap_client.patchTaskSoap(task_id, patch_obj)
+        updated_task = await soap_client.patchTaskSoap(task_id, patch_obj)
 
         # Invalidar caché usando la función unificada
-        invalidate_task_cache(redis, task_id)
+        await invalidate_task_cache(redis, task_id)
 
         # Convertimos a dict para Pydantic
         updated_task_dict = serialize_object(updated_task)
+        # actualizar el índice de títulos
+        await title_index.set_task_title(redis, task_id, updated_task_dict['title'])
         return TaskResponse.model_validate(updated_task_dict)
     
     # manejo de excepciones
@@ -298,7 +412,7 @@ def updateTask(
 
 # Endpoint para delete tarea
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     # El id de la tarea va en la ruta
     task_id: int,
     # Conexión a Redis
@@ -307,10 +421,11 @@ def delete_task(
 ):
     try:
         # Llamar al SOAP 
-        soap_client.deleteTaskSoap(task_id)
+        await soap_client.deleteTaskSoap(task_id)
 
         # Invalidar caché usando la función unificada
-        invalidate_task_cache(redis, task_id)
+        await invalidate_task_cache(redis, task_id)
+        await title_index.remove_task(redis, task_id)
         # Devolver que la petición se completo, no envia contenido
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     
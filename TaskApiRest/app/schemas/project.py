@@ -75,4 +75,34 @@ class ProjectFilters(BaseModel):
     id: Optional[str] = None
     title: Optional[str] = None
     priority: Optional[int] = Field(None, ge=1, le=5)
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+# Modelo de respuesta paginada con cursor
+class PaginatedProjectResponse(BaseModel):
+    projects: List[ProjectResponse]
+    total: int
+    next_cursor: Optional[str] = None
+
+# Resultado por línea de una importación masiva
+class BulkImportItem(BaseModel):
+    line: int
+    title: Optional[str] = None
+    status: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+# Reporte de la importación masiva por lotes
+class BulkImportReport(BaseModel):
+    import_id: str
+    chunk_size: int
+    chunks_committed: int
+    chunks_skipped: int
+    chunks_failed: int
+    projects_created: int
+    projects_failed: int
+    items: List[BulkImportItem]
+
+# Modelo de respuesta para get por varios ids
+class ProjectBatchResponse(BaseModel):
+    projects: List[ProjectResponse]
+    missing: List[str]
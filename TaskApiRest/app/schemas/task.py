@@ -33,7 +33,14 @@ class TaskResponse(TaskBase):
 # Modelo de respuesta para paginación
 class PaginatedTaskResponse(BaseModel):
     tasks: List[TaskResponse]
-    page: int
+    # page es None al paginar con cursor, los totales son None con includeTotal=false
+    page: Optional[int] = None
     pageSize: int
-    totalTasks: int
-    totalPages: int
\ No newline at end of file
+    totalTasks: Optional[int] = None
+    totalPages: Optional[int] = None
+    # cursor para la siguiente página, None si es la última
+    nextCursor: Optional[str] = None
+# Modelo de respuesta para get por varios ids
+class TaskBatchResponse(BaseModel):
+    tasks: List[TaskResponse]
+    missing: List[int]
@@ -2,8 +2,8 @@ import grpc
 from google.protobuf.empty_pb2 import Empty
 from app.core.config import settings
 from fastapi import HTTPException, status
-from typing import List, Dict, Optional
-import re
+from typing import AsyncIterator, List, Dict, Optional
+import json
 
 # importar los stubs generados a partir del proto
 from app.grpc_stubs.project_pb2 import (
@@ -11,17 +11,92 @@ from app.grpc_stubs.project_pb2 import (
     UpdateProjectRequest,
     GetProjectByIdRequest,
     ListProjectsRequest,
+    FindExistingTitlesRequest,
+    GetProjectsByIdsRequest,
     Project
 )
 from app.grpc_stubs.project_pb2_grpc import ProjectServiceStub
 
 
-# Configurar la conexionel canal GRPC y el cliente
-try:
-    channel = grpc.insecure_channel(settings.GRPC_SERVICE_URL)
-    grpc_client = ProjectServiceStub(channel) #llamar al cliente GRPC
-except Exception as e:
-    raise RuntimeError(f"No se pudo conectar con gRPC {e}")
+# Canal GRPC asíncrono y el cliente (se crean en el lifespan)
+channel: Optional[grpc.aio.Channel] = None
+grpc_client: Optional[ProjectServiceStub] = None
+
+# Métodos de solo lectura (se pueden reintentar) y de escritura
+_SERVICE_NAME = "project.ProjectService"
+_READ_METHODS = ["GetProjectById", "ListProjectsPage", "GetProjectsByIds", "FindExistingTitles"]
+# Streams: el deadline cubre todo el stream y no cada mensaje
+_STREAM_METHODS = ["ListProjects"]
+_WRITE_METHODS = ["CreateProject", "UpdateProject", "DeleteProject"]
+
+# Service config con política de reintentos y deadlines por método
+def _service_config() -> str:
+    def _names(methods):
+        return [{"service": _SERVICE_NAME, "method": m} for m in methods]
+
+    retry_policy = {
+        "maxAttempts": settings.GRPC_RETRY_MAX_ATTEMPTS,
+        "initialBackoff": "0.1s",
+        "maxBackoff": "1s",
+        "backoffMultiplier": 2,
+        "retryableStatusCodes": ["UNAVAILABLE"],
+    }
+    # los streams solo tienen deadline si se configura uno
+    stream_config = {"name": _names(_STREAM_METHODS), "retryPolicy": retry_policy}
+    if settings.GRPC_STREAM_TIMEOUT:
+        stream_config["timeout"] = f"{settings.GRPC_STREAM_TIMEOUT}s"
+
+    return json.dumps({
+        "methodConfig": [
+            {
+                "name": _names(_READ_METHODS),
+                "timeout": f"{settings.GRPC_READ_TIMEOUT}s",
+                "retryPolicy": retry_policy,
+            },
+            stream_config,
+            {
+                # las escrituras no se reintentan
+                "name": _names(_WRITE_METHODS),
+                "timeout": f"{settings.GRPC_WRITE_TIMEOUT}s",
+            },
+            {
+                "name": _names(["BulkCreateProjects"]),
+                "timeout": f"{settings.GRPC_BULK_TIMEOUT}s",
+            },
+        ]
+    })
+
+# Crea el canal con keepalive, reintentos y compresión opcional
+def init_grpc_channel() -> ProjectServiceStub:
+    global channel, grpc_client
+    if grpc_client is None:
+        try:
+            options = [
+                ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+                ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+                ("grpc.enable_retries", 1),
+                ("grpc.service_config", _service_config()),
+            ]
+            compression = grpc.Compression.Gzip if settings.GRPC_GZIP else grpc.Compression.NoCompression
+            channel = grpc.aio.insecure_channel(settings.GRPC_SERVICE_URL, options=options, compression=compression)
+            grpc_client = ProjectServiceStub(channel) #llamar al cliente GRPC
+        except Exception as e:
+            raise RuntimeError(f"No se pudo conectar con gRPC {e}")
+    return grpc_client
+
+# Obtener el cliente GRPC (lo crea si el lifespan no corrió)
+def _get_client() -> ProjectServiceStub:
+    return grpc_client or init_grpc_channel()
+
+# Cierra el canal GRPC
+async def close_grpc_channel():
+    global channel, grpc_client
+    if channel is not None:
+        await channel.close()
+    channel = None
+    grpc_client = None
 
 # Función para mapear errores GRPC a HTTPException
 def _map_grpc_error(err: grpc.RpcError, context: str = ""):
@@ -41,7 +116,7 @@ def _map_grpc_error(err: grpc.RpcError, context: str = ""):
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Error en servicio gRPC: {detail}")
 
 # GetById
-def getProjectByIdGrpc(project_id: str):
+async def getProjectByIdGrpc(project_id: str):
     try:
         # busca el proyecto por id        
         if not project_id:
@@ -52,7 +127,7 @@ def getProjectByIdGrpc(project_id: str):
             )
         # buscar id con el cliente GRPC
         req = GetProjectByIdRequest(id=str(project_id))
-        response = grpc_client.GetProjectById(req) #llamar al cliente GRPC
+        response = await _get_client().GetProjectById(req) #llamar al cliente GRPC
         return response
 
     # manejo de errores   
@@ -62,8 +137,24 @@ def getProjectByIdGrpc(project_id: str):
         print(f"Error: {e}")
         raise
 
+# Get varios por id en una sola llamada (los que no existen no se devuelven)
+async def getProjectsByIdsGrpc(project_ids: List[str]):
+    try:
+        if not project_ids:
+            return []
+        req = GetProjectsByIdsRequest(ids=[str(project_id) for project_id in project_ids])
+        response = await _get_client().GetProjectsByIds(req) #llamar al cliente GRPC
+        return list(response.projects)
+
+    # manejo de errores
+    except grpc.RpcError as err:
+        _map_grpc_error(err, "getProjectsByIds")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+
 # Get All
-def listProjectsGrpc(filters: Dict[str, str]):
+async def listProjectsGrpc(filters: Dict[str, str]):
     try:
         # Listar proyectos con filtros opcionales        
         filters_proto = {}
@@ -74,8 +165,8 @@ def listProjectsGrpc(filters: Dict[str, str]):
         
         # crear la request y llamar al servicio GRPC
         req = ListProjectsRequest(filters=filters_proto)
-        stream = grpc_client.ListProjects(req) #llamar al cliente GRPC
-        projects = [proj for proj in stream]
+        stream = _get_client().ListProjects(req) #llamar al cliente GRPC
+        projects = [proj async for proj in stream]
         # devolver la lista de proyectos
         return projects
 
@@ -86,8 +177,56 @@ def listProjectsGrpc(filters: Dict[str, str]):
         print(f"Error: {e}")
         raise
 
+# Página de proyectos con limit y cursor opaco
+async def listProjectsPageGrpc(filters: Dict[str, str], limit: int, cursor: Optional[str] = None):
+    try:
+        filters_proto = {key: str(value) for key, value in filters.items() if value is not None}
+        req = ListProjectsRequest(filters=filters_proto, limit=limit, cursor=cursor or "")
+        # devuelve los proyectos, el total y el cursor de la siguiente página
+        return await _get_client().ListProjectsPage(req) #llamar al cliente GRPC
+
+    # manejo de errores
+    except grpc.RpcError as err:
+        _map_grpc_error(err, "listProjectsPage")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+
+# Stream de proyectos, se entregan conforme llegan sin juntarlos en una lista
+async def streamProjectsGrpc(filters: Dict[str, str], limit: int = 0, cursor: Optional[str] = None) -> AsyncIterator[Project]:
+    filters_proto = {key: str(value) for key, value in filters.items() if value is not None}
+    req = ListProjectsRequest(filters=filters_proto, limit=limit, cursor=cursor or "")
+    call = _get_client().ListProjects(req) #llamar al cliente GRPC
+    try:
+        async for proj in call:
+            yield proj
+    except grpc.RpcError as err:
+        _map_grpc_error(err, "streamProjects")
+    finally:
+        # si el cliente HTTP se desconecta se cancela el stream de GRPC
+        call.cancel()
+
+# Verifica en una sola llamada qué títulos ya existen (None si el servidor no tiene el método)
+async def findExistingTitlesGrpc(titles: List[str]) -> Optional[List[str]]:
+    try:
+        if not titles:
+            return []
+        req = FindExistingTitlesRequest(titles=[t.strip() for t in titles])
+        response = await _get_client().FindExistingTitles(req) #llamar al cliente GRPC
+        return list(response.titles)
+
+    # manejo de errores
+    except grpc.RpcError as err:
+        # un servidor de una versión anterior no tiene FindExistingTitles
+        if err.code() == grpc.StatusCode.UNIMPLEMENTED:
+            return None
+        _map_grpc_error(err, "findExistingTitles")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+
 #createProject
-def createProjectGrpc(project):
+async def createProjectGrpc(project):
     try:        
         # Validaciones para el tipo de datos que envia
         if not project.title or project.title.strip() == "":
@@ -111,7 +250,7 @@ def createProjectGrpc(project):
         )
         
         # Manda la solicitud al servicio GRPC
-        response = grpc_client.CreateProject(req) #llamar al cliente GRPC
+        response = await _get_client().CreateProject(req) #llamar al cliente GRPC
         return response
     
     # manejo de errores
@@ -122,7 +261,7 @@ def createProjectGrpc(project):
         raise
 
 #updateProject
-def updateProjectGrpc(project_id: str, project):
+async def updateProjectGrpc(project_id: str, project):
     try:        
         # Validaciones previas para la base de datos
         if not project_id:
@@ -155,7 +294,7 @@ def updateProjectGrpc(project_id: str, project):
         )
         
         # Manda la solicitud al servicio GRPC
-        response = grpc_client.UpdateProject(req) #llamar al cliente GRPC
+        response = await _get_client().UpdateProject(req) #llamar al cliente GRPC
         return response
     # manejo de errores  
     except grpc.RpcError as err:
@@ -165,7 +304,7 @@ def updateProjectGrpc(project_id: str, project):
         raise
 
 #deleteProject
-def deleteProjectGrpc(project_id: str):
+async def deleteProjectGrpc(project_id: str):
     try:
         # Validaciones previas para la base de datos        
         if not project_id:
@@ -177,7 +316,7 @@ def deleteProjectGrpc(project_id: str):
         # crear la request y llamar al servicio GRPC    
         req = GetProjectByIdRequest(id=str(project_id))
         # GRPC devuelve empty
-        response = grpc_client.DeleteProject(req) #llamar al cliente GRPC
+        response = await _get_client().DeleteProject(req) #llamar al cliente GRPC
         return True
         #manejo de errores
     except grpc.RpcError as err:
@@ -187,7 +326,7 @@ def deleteProjectGrpc(project_id: str):
         raise
 
 #bulkCreateProjects
-def bulkCreateProjectsGrpc(projects: List):
+async def bulkCreateProjectsGrpc(projects: List):
     try:        
         # Validaciones para la base de datos
         for i, project in enumerate(projects):
@@ -212,7 +351,7 @@ def bulkCreateProjectsGrpc(projects: List):
                 )
                 
         # Llamar al servicio GRPC
-        response = grpc_client.BulkCreateProjects(project_generator()) #llamar al cliente GRPC
+        response = await _get_client().BulkCreateProjects(project_generator()) #llamar al cliente GRPC
            
         return response
 
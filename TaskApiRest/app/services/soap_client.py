@@ -1,9 +1,18 @@
-from zeep import Client
+import asyncio
+import hashlib
+import os
+import time
+import httpx
+from starlette.concurrency import run_in_threadpool
+from zeep import AsyncClient
+from zeep.cache import SqliteCache
+from zeep.transports import AsyncTransport
 from zeep.exceptions import Fault
 from app.core.config import settings
+from app.core.http_client import build_async_client
 from app.schemas.task import TaskCreate, TaskUpdate, TaskPatch
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import List, Optional
 
 # Excepciones
 class soapError(HTTPException):
@@ -62,36 +71,206 @@ def _map_and_raise(fault_text: str, fault_code: str):
     #gateway error
     raise soapError(fault_text)
 
-try:
-    # Conectar con soap usando la URL del WSDL de la configuración
-    client = Client(settings.SOAP_WSDL_URL)
-except Exception as e:
-    # Si el WSDL no carga
-    raise RuntimeError(f"No se pudo conectar{e}")
+class soapInvalidCursor(HTTPException):
+    # usa 400 cuando el cursor de paginación no es válido
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+
+class soapTimeout(HTTPException):
+    # usa 504 cuando el servicio soap no responde a tiempo
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"soap timeout {detail}"
+        )
+
+# Cliente SOAP asíncrono y su pool de conexiones HTTP (se crean en el lifespan o en el primer uso)
+client: Optional[AsyncClient] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_wsdl_client: Optional[httpx.Client] = None
+_init_lock: Optional[asyncio.Lock] = None
+# momento del último intento fallido de crear el cliente
+_init_failed_at: float = 0.0
+# operaciones que publica el WSDL cargado
+_operations: frozenset = frozenset()
+
+# Operaciones y argumentos nuevos que usa el gateway, si faltan el WSDL es de una versión anterior
+_REQUIRED_WSDL = {
+    "getAllTasks": ["cursor", "includeTotal"],
+    "getTasksByIds": ["task_ids"],
+}
+
+# Ruta del caché según la URL y la versión del servicio, un despliegue nuevo no lee el WSDL anterior
+def _wsdl_cache_path() -> str:
+    key = f"{settings.SOAP_WSDL_URL}|{settings.SOAP_SERVICE_VERSION}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+    root, ext = os.path.splitext(settings.SOAP_WSDL_CACHE_PATH)
+    return f"{root}-{digest}{ext or '.db'}"
+
+# Caché del WSDL en disco, si la carpeta no se puede usar se descarga sin caché
+def _wsdl_cache() -> Optional[SqliteCache]:
+    try:
+        path = _wsdl_cache_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return SqliteCache(path=path, timeout=settings.SOAP_WSDL_CACHE_TTL)
+    except Exception as e:
+        print(f"No se pudo usar el caché del WSDL {e}")
+        return None
+
+# Borra lo guardado en el caché del WSDL
+def _clear_wsdl_cache(cache: SqliteCache):
+    try:
+        with cache.db_connection() as conn:
+            conn.execute("DELETE FROM request")
+            conn.commit()
+    except Exception as e:
+        print(f"No se pudo limpiar el caché del WSDL {e}")
+
+# Lista lo que el gateway necesita y el WSDL no publica
+def _missing_in_wsdl(soap: AsyncClient) -> List[str]:
+    missing = []
+    for name, args in _REQUIRED_WSDL.items():
+        operation = soap.service._binding._operations.get(name)
+        if operation is None:
+            missing.append(name)
+            continue
+        params = {param for param, _ in operation.input.body.type.elements}
+        missing.extend(f"{name}.{arg}" for arg in args if arg not in params)
+    return missing
+
+# Crea el cliente SOAP con un transporte asíncrono compartido
+def init_soap_client() -> AsyncClient:
+    global client, _http_client, _wsdl_client, _operations
+    if client is None:
+        if _http_client is None:
+            _http_client = build_async_client(
+                max_connections=settings.SOAP_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SOAP_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.SOAP_HTTP_KEEPALIVE_EXPIRY,
+                timeout=settings.SOAP_HTTP_TIMEOUT,
+                connect_timeout=settings.SOAP_HTTP_CONNECT_TIMEOUT,
+            )
+        if _wsdl_client is None:
+            # cliente síncrono solo para descargar el WSDL y los XSD
+            _wsdl_client = httpx.Client(timeout=settings.SOAP_HTTP_TIMEOUT)
+        try:
+            # WSDL y XSD en un caché persistente en disco
+            cache = _wsdl_cache()
+            transport = AsyncTransport(client=_http_client, wsdl_client=_wsdl_client, cache=cache)
+            # Conectar con soap usando la URL del WSDL de la configuración
+            soap = AsyncClient(settings.SOAP_WSDL_URL, transport=transport)
+            missing = _missing_in_wsdl(soap)
+            if missing and cache is not None:
+                # el WSDL del caché es viejo, se descarga de nuevo
+                print(f"WSDL en caché sin {', '.join(missing)}, se descarga de nuevo")
+                _clear_wsdl_cache(cache)
+                soap = AsyncClient(settings.SOAP_WSDL_URL, transport=transport)
+                missing = _missing_in_wsdl(soap)
+            if missing:
+                print(f"El WSDL de {settings.SOAP_WSDL_URL} no publica {', '.join(missing)}")
+        except Exception as e:
+            # Si el WSDL no carga
+            raise RuntimeError(f"No se pudo conectar{e}")
+        _operations = frozenset(soap.service._operations)
+        client = soap
+    return client
+
+# Indica si el WSDL cargado publica la operación
+def supports_operation(operation: str) -> bool:
+    return operation in _operations
+
+# Obtener el cliente, si no existe se crea sin bloquear el event loop
+async def get_soap_client() -> AsyncClient:
+    global _init_lock, _init_failed_at
+    if client is not None:
+        return client
+    # el lock se crea dentro del event loop
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        if client is not None:
+            return client
+        # si acaba de fallar no se vuelve a esperar el timeout en cada petición de la fila
+        if time.monotonic() - _init_failed_at < settings.SOAP_INIT_RETRY_INTERVAL:
+            raise soapError("WSDL no disponible")
+        try:
+            return await run_in_threadpool(init_soap_client)
+        except RuntimeError as e:
+            _init_failed_at = time.monotonic()
+            raise soapError(str(e))
+
+# Crea el cliente en segundo plano al iniciar para no bloquear el arranque
+async def warm_soap_client():
+    try:
+        await get_soap_client()
+    except Exception as e:
+        print(f"Error al conectar con SOAP {e}")
+
+# Cierra el pool de conexiones del cliente SOAP
+async def close_soap_client():
+    global client, _http_client, _wsdl_client, _init_lock, _init_failed_at, _operations
+    if _http_client is not None:
+        await _http_client.aclose()
+    if _wsdl_client is not None:
+        _wsdl_client.close()
+    client = None
+    _operations = frozenset()
+    _http_client = None
+    _wsdl_client = None
+    # el lock pertenece al event loop que se cierra
+    _init_lock = None
+    _init_failed_at = 0.0
+
+# Ejecuta una operación del soap y convierte errores de red
+async def _call(operation: str, **kwargs):
+    soap = await get_soap_client()
+    # una operación que el WSDL no publica es un error del servicio, no del gateway
+    if operation not in _operations:
+        raise soapError(f"{operation} no está en el WSDL")
+    try:
+        return await getattr(soap.service, operation)(**kwargs)
+    except httpx.TimeoutException as e:
+        raise soapTimeout(f"{operation} {e}")
+    except httpx.RequestError as e:
+        raise soapError(f"{operation} {e}")
 
 #getAllTasksSoap
-def getAllTasksSoap(page: int, pageSize: int, filter: Optional[str], sortBy: Optional[str], sortOrder: str):
+async def getAllTasksSoap(page: int, pageSize: int, filter: Optional[str], sortBy: Optional[str], sortOrder: str,
+                          cursor: Optional[str] = None, includeTotal: bool = True):
+    # cursor e includeTotal solo se mandan si se usan
+    extra = {}
+    if cursor:
+        extra["cursor"] = cursor
+    if not includeTotal:
+        extra["includeTotal"] = False
     try:
         # respuesta del soap
-        response = client.service.getAllTasks(
+        response = await _call("getAllTasks",
             page=page,
             pageSize=pageSize,
             filter=filter,
             sortBy=sortBy,
-            sortOrder=sortOrder
+            sortOrder=sortOrder,
+            **extra
         )
         return response
     #Excepcion del servicio soap
     except Fault as f:
         fault_text = _fault_text(f)
         fault_code = _fault_code(f)
+        # cursor mal formado o de otro orden
+        if "InvalidCursor" in fault_code or "Cursor inválido" in fault_text:
+            raise soapInvalidCursor(fault_text)
         _map_and_raise(fault_text, fault_code)
 
 #getTaskById
-def getTaskByIdSoap(task_id: int):
+async def getTaskByIdSoap(task_id: int):
     try:
         #obtener respuesta según el id
-        response = client.service.getTaskById(task_id=task_id)
+        response = await _call("getTaskById", task_id=task_id)
         return response
         #excepciones que vienen tambien de soap
     except Fault as f:
@@ -102,11 +281,25 @@ def getTaskByIdSoap(task_id: int):
             raise soapNotFound(detail=fault_text)
         _map_and_raise(fault_text, fault_code)
 
+#getTasksByIds
+async def getTasksByIdsSoap(task_ids: List[int]):
+    try:
+        # sin ids no se llama al soap
+        if not task_ids:
+            return []
+        # el arreglo de enteros de spyne se manda como {"integer": [...]}
+        response = await _call("getTasksByIds", task_ids={"integer": list(task_ids)})
+        return response
+    except Fault as f:
+        fault_text = _fault_text(f)
+        fault_code = _fault_code(f)
+        _map_and_raise(fault_text, fault_code)
+
 #createTask
-def createTaskSoap(task: TaskCreate):
+async def createTaskSoap(task: TaskCreate):
     try:
         #crear tarea 
-        response = client.service.createTask(
+        response = await _call("createTask",
             title=task.title,
             description=task.description,
             endDate=task.endDate
@@ -123,10 +316,10 @@ def createTaskSoap(task: TaskCreate):
         _map_and_raise(fault_text, fault_code)
 
 #updateTask
-def updateTaskSoap(task_id: int, task: TaskUpdate):
+async def updateTaskSoap(task_id: int, task: TaskUpdate):
     # actualizar tarea
     try:
-        response = client.service.updateTask(
+        response = await _call("updateTask",
             task_id=task_id,
             title=task.title,
             description=task.description,
@@ -147,9 +340,9 @@ def updateTaskSoap(task_id: int, task: TaskUpdate):
         _map_and_raise(fault_text, fault_code)
 
 #patchTask
-def patchTaskSoap(task_id: int, task: TaskPatch):
+async def patchTaskSoap(task_id: int, task: TaskPatch):
     try:
-        response = client.service.patchTask(
+        response = await _call("patchTask",
             task_id=task_id,
             title=task.title,
             description=task.description,
@@ -170,9 +363,9 @@ def patchTaskSoap(task_id: int, task: TaskPatch):
         _map_and_raise(fault_text, fault_code)
 
 #deleteTask
-def deleteTaskSoap(task_id: int):
+async def deleteTaskSoap(task_id: int):
     try:
-        response_message = client.service.deleteTask(task_id=task_id)
+        response_message = await _call("deleteTask", task_id=task_id)
         return response_message
     except Fault as f:
         fault_text = _fault_text(f)
@@ -183,13 +376,28 @@ def deleteTaskSoap(task_id: int):
         _map_and_raise(fault_text, fault_code)
 
 #getTaskByTitle
-def getTaskByTitleSoap(title: str):
+async def getTaskByTitleSoap(title: str):
     try:
         # Llama al método getTaskByTitle de soap
-        response = client.service.getTaskByTitle(title=title)
+        response = await _call("getTaskByTitle", title=title)
         return response
     except Fault as f:
         # si el soap falla
         fault_text = _fault_text(f)
         fault_code = _fault_code(f)
-        _map_and_raise(fault_text, fault_code)
\ No newline at end of file
+        _map_and_raise(fault_text, fault_code)
+#getTaskByExactTitle
+async def getTaskByExactTitleSoap(title: str):
+    await get_soap_client()
+    # el WSDL es de una versión anterior del soap sin la operación, se usa la búsqueda por ilike
+    if not supports_operation("getTaskByExactTitle"):
+        return await getTaskByTitleSoap(title)
+    try:
+        # Llama al método getTaskByExactTitle de soap (busca por el título normalizado con índice)
+        response = await _call("getTaskByExactTitle", title=title)
+        return response
+    except Fault as f:
+        # si el soap falla
+        fault_text = _fault_text(f)
+        fault_code = _fault_code(f)
+        _map_and_raise(fault_text, fault_code)
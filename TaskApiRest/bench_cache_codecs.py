@@ -0,0 +1,94 @@
+"""Compara tamaño y tiempo de encode/decode de los formatos del caché.
+
+Uso (desde TaskApiRest):
+    python bench_cache_codecs.py                      # página sintética de 100 tareas
+    python bench_cache_codecs.py --redis "tasks_list:*"   # páginas reales guardadas en Redis
+    python bench_cache_codecs.py --file pagina.json   # respuesta guardada de GET /tasks?pageSize=100
+"""
+import argparse
+import datetime
+import os
+import time
+from app.dependencies import cache_codec
+
+
+# Página parecida a GET /tasks?pageSize=100
+def synthetic_page(size: int = 100) -> bytes:
+    tasks = [
+        {
+            "title": f"Tarea {i} de ejemplo",
+            "description": "Descripción de la tarea para revisar el tamaño del caché " * 2,
+            "endDate": datetime.date(2030, 1, 1) + datetime.timedelta(days=i),
+            "id": i,
+            "isCompleted": i % 3 == 0,
+        }
+        for i in range(1, size + 1)
+    ]
+    return cache_codec.dumps({"tasks": tasks, "page": 1, "pageSize": size, "totalTasks": 5000, "totalPages": 50})
+
+
+# Valores reales del caché (se decodifican al JSON original)
+def redis_payloads(pattern: str, limit: int):
+    from redis import Redis
+    conn = Redis(host=os.getenv("REDIS_HOST", "localhost"), port=int(os.getenv("REDIS_PORT", 6379)))
+    payloads = []
+    for key in conn.scan_iter(match=pattern, count=500):
+        entry = cache_codec.decode_entry(conn.get(key))
+        if entry:
+            payloads.append(entry[1])
+        if len(payloads) >= limit:
+            break
+    return payloads
+
+
+def bench(payloads, codec: bytes, compression: bytes, rounds: int):
+    encoded = [cache_codec.encode_entry(0, p, codec, compression) for p in payloads]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for p in payloads:
+            cache_codec.encode_entry(0, p, codec, compression)
+    encode_us = (time.perf_counter() - start) / (rounds * len(payloads)) * 1e6
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for e in encoded:
+            cache_codec.decode_entry(e)
+    decode_us = (time.perf_counter() - start) / (rounds * len(payloads)) * 1e6
+    size = sum(len(e) for e in encoded) / len(encoded)
+    return size, encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis", help="patrón de claves a leer de Redis")
+    parser.add_argument("--file", help="archivo con una respuesta JSON")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.redis:
+        payloads = redis_payloads(args.redis, args.limit)
+    elif args.file:
+        with open(args.file, "rb") as f:
+            payloads = [f.read()]
+    else:
+        payloads = [synthetic_page()]
+    if not payloads:
+        raise SystemExit("No hay valores para comparar")
+
+    # se compara siempre comprimiendo, sin importar el umbral configurado
+    cache_codec.CACHE_COMPRESSION_THRESHOLD = 0
+    raw_size = sum(len(p) for p in payloads) / len(payloads)
+    print(f"{len(payloads)} valores, JSON promedio {raw_size:.0f} bytes\n")
+    print(f"{'formato':<16}{'bytes':>10}{'ratio':>8}{'encode µs':>12}{'decode µs':>12}")
+    for codec_name, codec in cache_codec._CODEC_IDS.items():
+        for compression_name, compression in cache_codec._COMPRESSION_IDS.items():
+            name = f"{codec_name}+{compression_name}"
+            if codec not in cache_codec._CODECS or compression not in cache_codec._COMPRESSORS:
+                print(f"{name:<16}{'(no instalado)':>18}")
+                continue
+            size, encode_us, decode_us = bench(payloads, codec, compression, args.rounds)
+            print(f"{name:<16}{size:>10.0f}{size / raw_size:>8.2f}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,72 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from redis import Redis
-from app.dependencies.cache import get_redis_connection
+import asyncio
+from app.dependencies.cache import init_redis_connection, close_redis_connection, invalidation_listener
+from app.core import metrics
+from app.core.http_client import init_hydra_client, close_hydra_client
+from app.core.config import settings
+from app.dependencies.jwks import jwks_refresh_loop
+from app.dependencies.bloom_filter import rebuild_loop, tasks_filter, projects_filter
+from app.dependencies import title_index
+from app.services.soap_client import warm_soap_client, close_soap_client
+from app.services.grpc_client import init_grpc_channel, close_grpc_channel
 from app.routers import tasks
 from app.routers import projects 
 
-# Variable global para la conexión con Redis
-redis_conn = None
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Inicializa la conexión a Redis
-    global redis_conn
-    redis_conn = get_redis_connection()
+    # Inicializa el pool de conexiones asíncrono de Redis
+    redis_conn = init_redis_connection()
     # Verifica la conexión a Redis
     try:
-        redis_conn.ping()
+        await redis_conn.ping()
     except Exception as e:
         print(f"Error al conectar con Redis {e}")
+
+    # Escucha las invalidaciones del caché local de otros workers
+    invalidation_task = asyncio.create_task(invalidation_listener(redis_conn))
+
+    # Cliente HTTP con pool de conexiones para Hydra
+    init_hydra_client()
+
+    # Cliente SOAP asíncrono en segundo plano, si el servicio no responde se crea en la primera petición
+    soap_task = asyncio.create_task(warm_soap_client())
+
+    # Canal gRPC asíncrono (se conecta en la primera llamada)
+    init_grpc_channel()
+
+    # En modo jwt se descargan y refrescan las llaves de Hydra en segundo plano
+    jwks_task = None
+    if settings.AUTH_MODE == "jwt":
+        jwks_task = asyncio.create_task(jwks_refresh_loop())
+
+    # Llena los filtros de Bloom en segundo plano cuando no están listos o expiran
+    # (el índice de títulos se llena cuando una validación lo encuentra frío)
+    rebuild_tasks = []
+    if settings.BLOOM_FILTER_ENABLED:
+        rebuild_tasks += [
+            asyncio.create_task(rebuild_loop(redis_conn, tasks_filter, tasks.iter_task_ids)),
+            asyncio.create_task(rebuild_loop(redis_conn, projects_filter, projects.iter_project_ids)),
+        ]
     
     yield # La aplicación se ejecuta aquí
+
+    soap_task.cancel()
+    if jwks_task:
+        jwks_task.cancel()
+    for rebuild_task in rebuild_tasks:
+        rebuild_task.cancel()
+    title_index.cancel_rebuild()
+
+    # Cierra las conexiones abiertas con Hydra, SOAP y gRPC
+    await close_hydra_client()
+    await close_soap_client()
+    await close_grpc_channel()
     
+    invalidation_task.cancel()
+
     # Shutdown de Redis
-    if redis_conn:
-        redis_conn.close()
+    await close_redis_connection()
 
 # Creación de la aplicación FastAPI
 app = FastAPI(
@@ -36,3 +79,8 @@ app = FastAPI(
 app.include_router(tasks.router)
 app.include_router(projects.router)
 
+# Métricas del worker (contadores y tasas de aciertos de caché)
+@app.get("/metrics", tags=["Metrics"])
+async def getMetrics():
+    return metrics.snapshot()
+
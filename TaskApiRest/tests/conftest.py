@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Para importar el paquete app desde TaskApiRest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Valores mínimos de configuración para las pruebas (sin .env)
+for name, value in {
+    "SOAP_WSDL_URL": "http://soap.test/task?wsdl",
+    "GRPC_SERVICE_URL": "localhost:50051",
+    "REDIS_HOST": "localhost",
+    "HYDRA_ADMIN_URL": "http://hydra.test:4445",
+    "HYDRA_PUBLIC_URL": "http://hydra.test:4444",
+    "HYDRA_CLIENT_ID": "test",
+    "HYDRA_CLIENT_SECRET": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,101 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.dependencies.bloom_filter import BloomFilter, rebuild_if_needed
+
+
+@pytest.fixture
+def bloom(monkeypatch):
+    # filtro pequeño para que las pruebas sean rápidas
+    monkeypatch.setattr(settings, "BLOOM_FILTER_ENABLED", True)
+    monkeypatch.setattr(settings, "BLOOM_FILTER_BITS", 4096)
+    monkeypatch.setattr(settings, "BLOOM_FILTER_HASHES", 4)
+    monkeypatch.setattr(settings, "BLOOM_FILTER_MAX_AGE", 600)
+    return BloomFilter("test")
+
+
+async def ids(*items):
+    for item in items:
+        yield item
+
+
+async def failing_ids():
+    yield 1
+    raise RuntimeError("upstream caído")
+
+
+def test_not_ready_filter_rejects_nothing(bloom):
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await bloom.add(redis, 1)
+        return await bloom.is_ready(redis), await bloom.might_contain(redis, 999)
+
+    assert asyncio.run(scenario()) == (False, True)
+
+
+def test_ready_filter_rejects_unknown_ids(bloom):
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await bloom.rebuild(redis, ids(*range(1, 51)), batch_size=10)
+        known = [await bloom.might_contain(redis, item) for item in range(1, 51)]
+        return await bloom.is_ready(redis), known, await bloom.might_contain(redis, "no-existe")
+
+    ready, known, unknown = asyncio.run(scenario())
+    assert ready
+    # nunca hay falsos negativos
+    assert all(known)
+    assert unknown is False
+
+
+def test_ids_added_after_rebuild_are_accepted(bloom):
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await bloom.rebuild(redis, ids(1, 2))
+        await bloom.add(redis, 3)
+        return await bloom.might_contain(redis, 3)
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_rebuild_sets_expiry_and_expired_filter_stops_applying(bloom):
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await bloom.rebuild(redis, ids(1))
+        ttl = await redis.ttl(bloom.key)
+        # Redis expiró (o expulsó) el bitmap
+        await redis.delete(bloom.key)
+        return ttl, await bloom.is_ready(redis), await bloom.might_contain(redis, "no-existe")
+
+    ttl, ready, unknown = asyncio.run(scenario())
+    assert 0 < ttl <= 600
+    assert not ready
+    assert unknown is True
+
+
+def test_failed_rebuild_is_not_marked_ready(bloom):
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await rebuild_if_needed(redis, bloom, failing_ids)
+        return await bloom.is_ready(redis)
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_rebuild_if_needed_skips_ready_filter(bloom):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return ids(1)
+
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await rebuild_if_needed(redis, bloom, factory)
+        await rebuild_if_needed(redis, bloom, factory)
+        return await bloom.is_ready(redis)
+
+    assert asyncio.run(scenario())
+    assert calls == [1]
@@ -0,0 +1,79 @@
+import asyncio
+
+import fakeredis
+import orjson
+
+from app.core import metrics
+from app.dependencies import cache
+from app.dependencies.cache import (
+    TASKS_LIST_NAMESPACE,
+    backfill_entries,
+    invalidate_task_cache,
+    read_namespace_version,
+)
+from app.dependencies.cache_codec import decode_entry
+
+
+# Ejecuta un escenario con un Redis falso nuevo y el L1 vacío
+def run(scenario):
+    cache.evict_local("*")
+    server = fakeredis.FakeServer()
+    redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=False)
+    return asyncio.run(scenario(redis, server))
+
+
+async def read_task(redis, task_id: int):
+    entry = decode_entry(await redis.get(f"task:{task_id}"))
+    return orjson.loads(entry[1]) if entry else None
+
+
+def test_backfill_stores_entries_when_version_unchanged():
+    async def scenario(redis, server):
+        version = await read_namespace_version(redis, TASKS_LIST_NAMESPACE)
+        await backfill_entries({"task:1": {"id": 1, "title": "a"}}, redis, TASKS_LIST_NAMESPACE, version)
+        return await read_task(redis, 1)
+
+    assert run(scenario) == {"id": 1, "title": "a"}
+
+
+def test_backfill_skipped_after_a_write():
+    skipped = metrics.get_counter("cache_backfill_skipped")
+
+    async def scenario(redis, server):
+        version = await read_namespace_version(redis, TASKS_LIST_NAMESPACE)
+        # un PATCH termina mientras la lista (con datos viejos) venía del upstream
+        await invalidate_task_cache(redis, 1)
+        await backfill_entries({"task:1": {"id": 1, "title": "viejo"}}, redis, TASKS_LIST_NAMESPACE, version)
+        return await read_task(redis, 1)
+
+    assert run(scenario) is None
+    assert metrics.get_counter("cache_backfill_skipped") == skipped + 1
+
+
+def test_backfill_skipped_when_version_changes_before_exec(monkeypatch):
+    skipped = metrics.get_counter("cache_backfill_skipped")
+
+    async def scenario(redis, server):
+        version = await read_namespace_version(redis, TASKS_LIST_NAMESPACE)
+        other_worker = fakeredis.FakeRedis(server=server)
+        encode = cache.encode_entry
+
+        # la versión cambia después de revisarla y antes del EXEC, WATCH debe abortar
+        def encode_and_bump(*args):
+            other_worker.incr(f"cache_version:{TASKS_LIST_NAMESPACE}")
+            return encode(*args)
+
+        monkeypatch.setattr(cache, "encode_entry", encode_and_bump)
+        await backfill_entries({"task:1": {"id": 1}}, redis, TASKS_LIST_NAMESPACE, version)
+        return await read_task(redis, 1)
+
+    assert run(scenario) is None
+    assert metrics.get_counter("cache_backfill_skipped") == skipped + 1
+
+
+def test_backfill_without_version_does_nothing():
+    async def scenario(redis, server):
+        await backfill_entries({"task:1": {"id": 1}}, redis, TASKS_LIST_NAMESPACE, None)
+        return await redis.exists("task:1")
+
+    assert run(scenario) == 0
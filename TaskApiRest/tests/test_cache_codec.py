@@ -0,0 +1,62 @@
+import orjson
+import pytest
+
+from app.dependencies import cache_codec
+from app.dependencies.cache_codec import decode_entry, dumps, encode_entry
+
+PAYLOAD = dumps({"id": 1, "title": "Tarea", "endDate": "2030-01-01", "tags": ["a"] * 500})
+SMALL_PAYLOAD = dumps({"id": 2})
+
+
+def test_json_entry_has_header_and_round_trips():
+    raw = encode_entry(123.5, PAYLOAD, codec=b"j", compression=b"n")
+    assert raw.startswith(b"jn123.500|")
+    assert decode_entry(raw) == (123.5, PAYLOAD)
+
+
+def test_zlib_compresses_large_values():
+    raw = encode_entry(1.0, PAYLOAD, codec=b"j", compression=b"z")
+    assert raw[:2] == b"jz"
+    assert len(raw) < len(PAYLOAD)
+    assert decode_entry(raw) == (1.0, PAYLOAD)
+
+
+def test_values_below_threshold_are_not_compressed():
+    assert len(SMALL_PAYLOAD) < cache_codec.CACHE_COMPRESSION_THRESHOLD
+    raw = encode_entry(1.0, SMALL_PAYLOAD, codec=b"j", compression=b"z")
+    # el header dice la compresión real, no la configurada
+    assert raw[:2] == b"jn"
+    assert decode_entry(raw) == (1.0, SMALL_PAYLOAD)
+
+
+@pytest.mark.skipif(cache_codec.msgpack is None, reason="msgpack no instalado")
+def test_msgpack_decodes_back_to_json():
+    raw = encode_entry(1.0, PAYLOAD, codec=b"m", compression=b"n")
+    assert raw[:2] == b"mn"
+    soft_expires, body = decode_entry(raw)
+    assert orjson.loads(body) == orjson.loads(PAYLOAD)
+
+
+@pytest.mark.skipif(cache_codec.zstandard is None, reason="zstandard no instalado")
+def test_zstd_round_trip():
+    raw = encode_entry(1.0, PAYLOAD, codec=b"j", compression=b"s")
+    assert raw[:2] == b"js"
+    assert decode_entry(raw) == (1.0, PAYLOAD)
+
+
+def test_legacy_entries_without_header_are_read():
+    # valores escritos antes del header, siguen en Redis hasta su TTL
+    assert decode_entry(b"1700000000.250|" + SMALL_PAYLOAD) == (1700000000.25, SMALL_PAYLOAD)
+
+
+@pytest.mark.parametrize("raw", [
+    None,
+    b"",
+    b"xn1.0|{}",        # codec desconocido
+    b"jq1.0|{}",        # compresión desconocida
+    b"jn1.0{}",         # sin separador
+    b"jz1.0|no-es-zlib",
+    b"jnabc|{}",        # soft_expires no numérico
+])
+def test_unreadable_entries_are_misses(raw):
+    assert decode_entry(raw) is None
@@ -0,0 +1,144 @@
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.config import settings
+from app.dependencies import jwks
+from app.dependencies.authentication import check_scope_jwt
+
+ISSUER = "http://hydra.test:4444/"
+
+
+# Genera una llave RSA y su JWK público con el kid indicado
+def make_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_jwk = jwk.construct(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ), "RS256").to_dict()
+    public_jwk.update(kid=kid, use="sig", alg="RS256")
+    return pem, public_jwk
+
+
+def make_token(pem, kid: str, scopes: str = "read write", expires_in: int = 300, **claims):
+    now = int(time.time())
+    payload = {"iss": ISSUER, "sub": "client", "iat": now, "exp": now + expires_in, "scp": scopes.split()}
+    payload.update(claims)
+    return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+# JWKS local que cuenta las descargas
+class FakeHydra:
+    def __init__(self, keys):
+        self.keys = keys
+        self.fetches = 0
+
+    async def get(self, url):
+        self.fetches += 1
+        keys = self.keys
+
+        class _Response:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"keys": keys}
+
+        return _Response()
+
+
+@pytest.fixture
+def signing_key(monkeypatch):
+    pem, public_jwk = make_key("key-1")
+    hydra = FakeHydra([public_jwk])
+    monkeypatch.setattr(jwks, "get_hydra_client", lambda: hydra)
+    monkeypatch.setattr(settings, "JWT_ISSUER", ISSUER)
+    monkeypatch.setattr(settings, "JWT_AUDIENCE", None)
+    monkeypatch.setattr(settings, "JWT_ALGORITHMS", "RS256,ES256")
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_INTERVAL", 10)
+    jwks.load_jwks({"keys": [public_jwk]})
+    return pem, hydra
+
+
+def test_valid_token_with_scope(signing_key):
+    pem, hydra = signing_key
+    token = make_token(pem, "key-1")
+    assert asyncio.run(check_scope_jwt(token, "read")) is True
+    assert hydra.fetches == 0
+
+
+def test_expired_token(signing_key):
+    pem, _ = signing_key
+    token = make_token(pem, "key-1", expires_in=-60)
+    assert asyncio.run(jwks.verify_jwt(token)) is None
+    assert asyncio.run(check_scope_jwt(token, "read")) is False
+
+
+def test_missing_scope(signing_key):
+    pem, _ = signing_key
+    token = make_token(pem, "key-1", scopes="read")
+    assert asyncio.run(check_scope_jwt(token, "write")) is False
+
+
+def test_scope_as_string_claim(signing_key):
+    pem, _ = signing_key
+    # otros emisores mandan "scope" como texto en lugar de "scp"
+    token = make_token(pem, "key-1", scp=None, scope="read write")
+    assert asyncio.run(check_scope_jwt(token, "write")) is True
+
+
+def test_wrong_issuer(signing_key):
+    pem, _ = signing_key
+    token = make_token(pem, "key-1", iss="http://otro.test/")
+    assert asyncio.run(check_scope_jwt(token, "read")) is False
+
+
+def test_unknown_kid_refreshes_jwks_once(signing_key):
+    pem, hydra = signing_key
+    # Hydra rotó la llave: el kid nuevo no está en memoria pero sí en el JWKS
+    new_pem, new_jwk = make_key("key-2")
+    hydra.keys = [new_jwk]
+    # la última descarga fue hace más del intervalo mínimo
+    jwks._last_fetch = time.monotonic() - 60
+    assert asyncio.run(check_scope_jwt(make_token(new_pem, "key-2"), "read")) is True
+    assert hydra.fetches == 1
+
+    # otro kid desconocido dentro del intervalo mínimo no vuelve a descargar
+    other_pem, _ = make_key("key-3")
+    assert asyncio.run(check_scope_jwt(make_token(other_pem, "key-3"), "read")) is False
+    assert hydra.fetches == 1
+
+
+def test_alg_none_rejected(signing_key):
+    now = int(time.time())
+    token = "%s.%s." % (
+        _b64({"alg": "none", "kid": "key-1", "typ": "JWT"}),
+        _b64({"iss": ISSUER, "exp": now + 300, "scp": ["read"]}),
+    )
+    assert asyncio.run(check_scope_jwt(token, "read")) is False
+
+
+def test_disallowed_alg_rejected(signing_key):
+    # HS256 no está en JWT_ALGORITHMS aunque el kid exista
+    token = jwt.encode(
+        {"iss": ISSUER, "exp": int(time.time()) + 300, "scp": ["read"]},
+        "secret",
+        algorithm="HS256",
+        headers={"kid": "key-1"},
+    )
+    assert asyncio.run(check_scope_jwt(token, "read")) is False
@@ -0,0 +1,58 @@
+import asyncio
+
+import fakeredis
+
+from app.dependencies import cache
+from app.dependencies.cache import NEGATIVE_CACHE_TTL, clear_missing, is_known_missing, mark_missing
+
+
+class BrokenRedis:
+    # Redis sin conexión: cualquier comando falla
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("redis caído")
+        return fail
+
+
+def test_marked_key_is_known_missing_with_ttl():
+    cache.evict_local("*")
+    redis = fakeredis.FakeAsyncRedis()
+
+    async def scenario():
+        await mark_missing(redis, "task:404")
+        return await is_known_missing("task:404", redis), await redis.ttl("missing:task:404")
+
+    known, ttl = asyncio.run(scenario())
+    assert known
+    assert 0 < ttl <= NEGATIVE_CACHE_TTL
+
+
+def test_tombstone_from_another_worker_is_read_from_redis():
+    cache.evict_local("*")
+    redis = fakeredis.FakeAsyncRedis()
+
+    async def scenario():
+        await mark_missing(redis, "task:404")
+        # este worker no tiene la marca en su L1
+        cache.evict_local("*")
+        return await is_known_missing("task:404", redis), await is_known_missing("task:1", redis)
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_clear_missing_removes_tombstone_from_redis_and_l1():
+    cache.evict_local("*")
+    redis = fakeredis.FakeAsyncRedis()
+
+    async def scenario():
+        await mark_missing(redis, "task:7")
+        # la tarea se crea con ese id
+        await clear_missing(redis, "task:7")
+        return await is_known_missing("task:7", redis), await redis.exists("missing:task:7")
+
+    assert asyncio.run(scenario()) == (False, 0)
+
+
+def test_redis_errors_do_not_hide_existing_ids():
+    cache.evict_local("*")
+    assert asyncio.run(is_known_missing("task:1", BrokenRedis())) is False
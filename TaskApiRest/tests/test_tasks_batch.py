@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+
+import fakeredis
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.dependencies import cache
+from app.dependencies.cache import get_or_compute_many, get_redis_connection, store_entries
+from app.routers import tasks
+from app.services import soap_client
+
+# Tareas que existen en el soap de prueba
+TASKS = {
+    task_id: {
+        "id": task_id,
+        "title": f"Tarea {task_id}",
+        "description": "",
+        "isCompleted": False,
+        "endDate": datetime.date(2030, 1, task_id),
+    }
+    for task_id in (1, 2, 3)
+}
+
+
+@pytest.fixture
+def redis():
+    # el L1 es global del módulo, cada prueba empieza sin entradas
+    cache.evict_local("*")
+    return fakeredis.FakeAsyncRedis(decode_responses=False)
+
+
+@pytest.fixture
+def soap_calls(monkeypatch):
+    calls = []
+
+    async def get_tasks_by_ids(task_ids):
+        calls.append(list(task_ids))
+        return [TASKS[task_id] for task_id in task_ids if task_id in TASKS]
+
+    monkeypatch.setattr(soap_client, "getTasksByIdsSoap", get_tasks_by_ids)
+    return calls
+
+
+@pytest.fixture
+def client(redis, soap_calls):
+    app = FastAPI()
+    app.include_router(tasks.router)
+    app.dependency_overrides[get_redis_connection] = lambda: redis
+    app.dependency_overrides[tasks.auth_read.dependency] = lambda: True
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_many_computes_only_missing_keys(redis):
+    computed = []
+
+    async def compute(keys):
+        computed.append(keys)
+        return {key: {"key": key} for key in keys}
+
+    async def scenario():
+        await store_entries({"task:1": {"key": "task:1"}}, redis)
+        cache.evict_local("*")
+        first = await get_or_compute_many(["task:1", "task:2"], compute, redis)
+        second = await get_or_compute_many(["task:1", "task:2"], compute, redis)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == {"task:1": {"key": "task:1"}, "task:2": {"key": "task:2"}}
+    assert computed == [["task:2"]]
+
+
+def test_many_serves_stale_entries_when_upstream_fails(redis):
+    async def compute(keys):
+        raise HTTPException(status_code=502, detail="soap caído")
+
+    async def scenario():
+        # soft TTL vencido, la entrada sigue en Redis hasta el hard TTL
+        await store_entries({"task:1": {"id": 1}}, redis, soft_ttl=-1)
+        cache.evict_local("*")
+        return await get_or_compute_many(["task:1"], compute, redis)
+
+    assert asyncio.run(scenario()) == {"task:1": {"id": 1}}
+
+
+def test_many_raises_client_errors_even_with_stale_entries(redis):
+    async def compute(keys):
+        raise HTTPException(status_code=400, detail="id inválido")
+
+    async def scenario():
+        await store_entries({"task:1": {"id": 1}}, redis, soft_ttl=-1)
+        cache.evict_local("*")
+        return await get_or_compute_many(["task:1"], compute, redis)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(scenario())
+
+
+def test_batch_keeps_requested_order_and_reports_missing(client, soap_calls):
+    response = client.get("/tasks/batch", params={"ids": "3,1,9"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [task["id"] for task in body["tasks"]] == [3, 1]
+    assert body["missing"] == [9]
+    assert soap_calls == [[3, 1, 9]]
+
+
+def test_batch_second_request_is_served_from_cache(client, soap_calls):
+    client.get("/tasks/batch", params={"ids": "1,2,9"})
+    response = client.get("/tasks/batch", params={"ids": "2,9,1"})
+    assert [task["id"] for task in response.json()["tasks"]] == [2, 1]
+    assert response.json()["missing"] == [9]
+    # el 9 quedó marcado como inexistente y no se vuelve a pedir
+    assert soap_calls == [[1, 2, 9]]
+
+
+def test_batch_removes_repeated_ids(client, soap_calls):
+    response = client.get("/tasks/batch?ids=2&ids=2,1")
+    assert response.status_code == 200
+    assert soap_calls == [[2, 1]]
+
+
+@pytest.mark.parametrize("ids", ["1,abc", "0", ","])
+def test_batch_rejects_invalid_ids(client, soap_calls, ids):
+    assert client.get("/tasks/batch", params={"ids": ids}).status_code == 400
+    assert soap_calls == []
+
+
+def test_batch_limits_number_of_ids(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_IDS", 2)
+    assert client.get("/tasks/batch", params={"ids": "1,2,3"}).status_code == 400
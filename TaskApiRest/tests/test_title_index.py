@@ -0,0 +1,179 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.dependencies import title_index
+from app.dependencies.title_index import TITLE_INDEX_IDS_KEY, TITLE_INDEX_KEY
+from app.routers import tasks
+from app.services import soap_client
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "TITLE_INDEX_ENABLED", True)
+    monkeypatch.setattr(settings, "TITLE_INDEX_MAX_AGE", 300)
+
+
+async def soap_tasks(*titles):
+    for task_id, title in enumerate(titles, start=1):
+        yield {"id": task_id, "title": title}
+
+
+# Redis con el índice ya construido a partir de esos títulos
+async def built_index(*titles):
+    redis = fakeredis.FakeAsyncRedis()
+    await title_index.rebuild(redis, soap_tasks(*titles))
+    return redis
+
+
+class CountingLock:
+    def __init__(self):
+        self.renewals = 0
+
+    async def reacquire(self):
+        self.renewals += 1
+
+
+def test_cold_index_is_not_trusted():
+    async def scenario():
+        return await title_index.find_task_id(fakeredis.FakeAsyncRedis(), "Comprar pan")
+
+    assert asyncio.run(scenario()) == (False, None)
+
+
+def test_rebuilt_index_finds_titles_ignoring_case_and_spaces():
+    async def scenario():
+        redis = await built_index("Comprar pan", "Lavar ropa")
+        found = await title_index.find_task_id(redis, "  comprar PAN ")
+        absent = await title_index.find_task_id(redis, "Pagar luz")
+        return found, absent, await redis.ttl(TITLE_INDEX_KEY), await redis.ttl(TITLE_INDEX_IDS_KEY)
+
+    found, absent, ttl, ids_ttl = asyncio.run(scenario())
+    assert found == (True, 1)
+    # listo y sin la tarea: no hay conflicto
+    assert absent == (True, None)
+    assert 0 < ttl <= 300 and 0 < ids_ttl <= 300
+
+
+def test_rebuild_keeps_first_of_repeated_titles():
+    async def scenario():
+        redis = await built_index("Repetida", "repetida ")
+        return await title_index.find_task_id(redis, "REPETIDA")
+
+    assert asyncio.run(scenario()) == (True, 1)
+
+
+def test_rebuild_renews_lock_every_batch():
+    lock = CountingLock()
+
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        await title_index.rebuild(redis, soap_tasks(*[f"t{i}" for i in range(25)]), batch_size=10, lock=lock)
+
+    asyncio.run(scenario())
+    assert lock.renewals == 2
+
+
+def test_rename_frees_old_title():
+    async def scenario():
+        redis = await built_index("Viejo")
+        await title_index.set_task_title(redis, 1, "Nuevo")
+        return await title_index.find_task_id(redis, "Viejo"), await title_index.find_task_id(redis, "Nuevo")
+
+    assert asyncio.run(scenario()) == ((True, None), (True, 1))
+
+
+def test_rename_keeps_title_owned_by_another_task():
+    async def scenario():
+        redis = await built_index("Compartido", "Otro")
+        # la tarea 2 quedó registrada con el título de la 1 (entrada vieja)
+        await redis.hset(TITLE_INDEX_IDS_KEY, 2, "compartido")
+        await title_index.set_task_title(redis, 2, "Renombrada")
+        return await title_index.find_task_id(redis, "Compartido")
+
+    assert asyncio.run(scenario()) == (True, 1)
+
+
+def test_remove_task_frees_its_title():
+    async def scenario():
+        redis = await built_index("Borrar")
+        await title_index.remove_task(redis, 1)
+        return await title_index.find_task_id(redis, "Borrar"), await redis.hexists(TITLE_INDEX_IDS_KEY, 1)
+
+    assert asyncio.run(scenario()) == ((True, None), False)
+
+
+def test_conflict_from_index_is_confirmed_with_soap(monkeypatch):
+    async def get_task_by_id(task_id):
+        return {"id": task_id, "title": "Comprar pan"}
+
+    async def exact_title(title):
+        raise AssertionError("no debe consultar por título")
+
+    monkeypatch.setattr(soap_client, "getTaskByIdSoap", get_task_by_id)
+    monkeypatch.setattr(soap_client, "getTaskByExactTitleSoap", exact_title)
+
+    async def scenario():
+        redis = await built_index("Comprar pan")
+        await tasks.ensure_title_not_conflicting("comprar pan", redis=redis)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 409
+
+
+def test_task_can_keep_its_own_title(monkeypatch):
+    async def fail(*args):
+        raise AssertionError("no debe consultar el soap")
+
+    monkeypatch.setattr(soap_client, "getTaskByIdSoap", fail)
+    monkeypatch.setattr(soap_client, "getTaskByExactTitleSoap", fail)
+
+    async def scenario():
+        redis = await built_index("Comprar pan")
+        await tasks.ensure_title_not_conflicting("Comprar pan", current_id=1, redis=redis)
+
+    asyncio.run(scenario())
+
+
+def test_stale_index_entry_is_dropped(monkeypatch):
+    exact_calls = []
+
+    async def get_task_by_id(task_id):
+        # la tarea cambió de título directamente en el soap
+        return {"id": task_id, "title": "Otro título"}
+
+    async def exact_title(title):
+        exact_calls.append(title)
+        return []
+
+    monkeypatch.setattr(soap_client, "getTaskByIdSoap", get_task_by_id)
+    monkeypatch.setattr(soap_client, "getTaskByExactTitleSoap", exact_title)
+
+    async def scenario():
+        redis = await built_index("Comprar pan")
+        await tasks.ensure_title_not_conflicting("Comprar pan", redis=redis)
+        return await title_index.find_task_id(redis, "Comprar pan")
+
+    assert asyncio.run(scenario()) == (True, None)
+    assert exact_calls == ["Comprar pan"]
+
+
+def test_cold_index_schedules_rebuild_and_asks_soap(monkeypatch):
+    scheduled = []
+    exact_calls = []
+
+    async def exact_title(title):
+        exact_calls.append(title)
+        return [{"id": 5, "title": title}]
+
+    monkeypatch.setattr(title_index, "schedule_rebuild", lambda redis, factory: scheduled.append(factory))
+    monkeypatch.setattr(soap_client, "getTaskByExactTitleSoap", exact_title)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(tasks.ensure_title_not_conflicting("Nueva", redis=fakeredis.FakeAsyncRedis()))
+    assert scheduled == [tasks.iter_tasks]
+    assert exact_calls == ["Nueva"]
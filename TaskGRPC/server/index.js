@@ -5,7 +5,7 @@ const protoLoader = require("@grpc/proto-loader");
 const { ObjectId } = require("mongodb");
 const { initDb, getCollection } = require("./db");
 const { validateCreateRequest, validateUpdateRequest, validateId, validateBulkProject } = require("./validations");
-const { docToProject, buildMongoFilters } = require("./utils");
+const { docToProject, buildMongoFilters, normalizeLimit, encodeCursor, applyCursor } = require("./utils");
 
 // Cargar el archivo proto de definición del servicio gRPC
 const PROTO_PATH = path.join(__dirname, "../proto/project.proto");
@@ -161,6 +161,28 @@ async function GetProjectById(call, callback) {
   }
 }
 
+// obtener varios proyectos por id en una sola consulta
+async function GetProjectsByIds(call, callback) {
+  try {
+    // los ids que no son ObjectId válidos no pueden existir, se omiten
+    const oids = (call.request.ids || []).filter((id) => ObjectId.isValid(id)).map((id) => new ObjectId(id));
+    if (oids.length === 0) {
+      return callback(null, { projects: [] });
+    }
+
+    // buscar todos los proyectos con $in
+    const coll = getCollection();
+    const docs = await coll.find({ _id: { $in: oids } }).toArray();
+
+    // devolver los proyectos encontrados, los que no existen se omiten
+    return callback(null, { projects: docs.map(docToProject) });
+  } catch (err) {
+    // manejo de errores
+    console.error("Error:", err);
+    return callback({ code: grpc.status.INTERNAL, message: "Error interno" });
+  }
+}
+
 //GetAll:ServerStreaming
 async function ListProjects(call) {
   try {
@@ -170,8 +192,11 @@ async function ListProjects(call) {
     const filters = call.request.filters || {};
     const mongoFilter = buildMongoFilters(filters);
 
-    // ejecutar consulta 
-    const cursor = coll.find(mongoFilter);
+    // ejecutar consulta, con limit y cursor opcionales ordenando por _id
+    let cursor = coll.find(applyCursor(mongoFilter, call.request.cursor)).sort({ _id: 1 });
+    if (call.request.limit > 0) {
+      cursor = cursor.limit(normalizeLimit(call.request.limit));
+    }
 
     // enviar resultados 
     for await (const doc of cursor) {
@@ -188,6 +213,62 @@ async function ListProjects(call) {
   }
 }
 
+//GetAll paginado con cursor (keyset sobre _id)
+async function ListProjectsPage(call, callback) {
+  try {
+    // preparar consulta de la base de datos
+    const coll = getCollection();
+    const filters = call.request.filters || {};
+    const mongoFilter = buildMongoFilters(filters);
+    const limit = normalizeLimit(call.request.limit);
+
+    // se pide un documento extra para saber si hay otra página
+    const [docs, total] = await Promise.all([
+      coll.find(applyCursor(mongoFilter, call.request.cursor)).sort({ _id: 1 }).limit(limit + 1).toArray(),
+      coll.countDocuments(mongoFilter),
+    ]);
+    const hasMore = docs.length > limit;
+    const page = hasMore ? docs.slice(0, limit) : docs;
+
+    // devolver la página, el total y el cursor de la siguiente página
+    return callback(null, {
+      projects: page.map(docToProject),
+      total,
+      nextCursor: hasMore ? encodeCursor(page[page.length - 1]._id) : "",
+    });
+  } catch (err) {
+    if (err.code && err.message) {
+      return callback(err);
+    }
+    // manejo de errores
+    console.error("Error:", err);
+    return callback({ code: grpc.status.INTERNAL, message: "Error interno" });
+  }
+}
+
+// Buscar en una sola consulta qué títulos ya existen (sin distinguir mayúsculas)
+async function FindExistingTitles(call, callback) {
+  try {
+    const titles = (call.request.titles || []).map((t) => t.trim()).filter((t) => t !== "");
+    if (titles.length === 0) {
+      return callback(null, { titles: [] });
+    }
+
+    // consulta con $in y collation para comparar sin mayúsculas
+    const coll = getCollection();
+    const existing = await coll
+      .find({ title: { $in: titles } }, { projection: { title: 1 }, collation: { locale: "en", strength: 2 } })
+      .toArray();
+
+    // devolver los títulos que ya existen
+    return callback(null, { titles: existing.map((doc) => doc.title) });
+  } catch (err) {
+    // manejo de errores
+    console.error("Error:", err);
+    return callback({ code: grpc.status.INTERNAL, message: "Error interno" });
+  }
+}
+
 // BulkCreateProjects:ClientStreaming
 async function BulkCreateProjects(call, callback) {
   const coll = getCollection();
@@ -277,8 +358,11 @@ async function main() {
     UpdateProject,
     DeleteProject,
     GetProjectById,
+    GetProjectsByIds,
     ListProjects,
+    ListProjectsPage,
     BulkCreateProjects,
+    FindExistingTitles,
   });
 
   // arrancar servidor en el puerto especificado
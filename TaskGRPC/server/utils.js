@@ -1,5 +1,6 @@
 // cargar dependencias
 const { ObjectId } = require("mongodb");
+const grpc = require("@grpc/grpc-js");
 
 // Convierte un documento de MongoDB al formato de protobuf 
 function docToProject(doc) {
@@ -48,8 +49,42 @@ function buildMongoFilters(filters = {}) {
   return mongoFilter;
 }
 
+// límites de paginación
+const DEFAULT_PAGE_LIMIT = 50;
+const MAX_PAGE_LIMIT = 500;
+
+// normalizar el limit recibido (0 o inválido usa el valor por defecto)
+function normalizeLimit(limit) {
+  const n = parseInt(limit, 10);
+  if (!n || n < 1) return DEFAULT_PAGE_LIMIT;
+  return Math.min(n, MAX_PAGE_LIMIT);
+}
+
+// el cursor es opaco para el cliente, guarda el último _id de la página
+function encodeCursor(id) {
+  return Buffer.from(id.toString(), "utf8").toString("base64url");
+}
+
+// convertir el cursor a ObjectId, si no es válido devuelve INVALID_ARGUMENT
+function decodeCursor(cursor) {
+  try {
+    return new ObjectId(Buffer.from(cursor, "base64url").toString("utf8"));
+  } catch {
+    throw { code: grpc.status.INVALID_ARGUMENT, message: "cursor inválido" };
+  }
+}
+
+// agregar el cursor al filtro para buscar después del último _id (keyset)
+function applyCursor(mongoFilter, cursor) {
+  if (!cursor) return mongoFilter;
+  return { ...mongoFilter, _id: { ...(mongoFilter._id ? { $eq: mongoFilter._id } : {}), $gt: decodeCursor(cursor) } };
+}
+
 // exportar funciones para ser utilizadas por index.js
 module.exports = {
   docToProject,
-  buildMongoFilters
+  buildMongoFilters,
+  normalizeLimit,
+  encodeCursor,
+  applyCursor
 };
\ No newline at end of file